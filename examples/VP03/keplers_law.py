@@ -1,19 +1,27 @@
+import argparse
+import os
+import sys
+import numpy as np
 from vpython import *
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from vptools.gravity import Gravity
+from vptools.render import BulkRenderer
+
 G = 6.673E-11
 mass = {'sun': 1.989E30, 'earth': 5.972E24, 'mars':6.4169E23, 'halley': 2.2E14}
 d_at_perihelion = {'earth': 1.495E11, 'mars':2.279E11, 'halley': 8.7665E10}
 v_at_perihelion = {'earth': 2.9783E4, 'mars':2.4077E4, 'halley': 54563.3}
-
-def G_force(m, pos_vec):
-    return -G * mass['sun'] * m / mag2(pos_vec) * norm(pos_vec)
+parser = argparse.ArgumentParser()
+parser.add_argument('--asteroids', type=int, default=0, help='add a belt of this many test particles between mars and jupiter')
+n_asteroids = parser.parse_known_args()[0].asteroids
 
 class as_obj(sphere):
     def kinetic_energy(self):
         return 0.5 * self.m * mag2(self.v)
     def potential_energy(self):
         return - G * mass['sun'] * self.m / mag(self.pos)
-    
+
 scene = canvas(width=800, height=800, background=vector(0.5,0.5,0))
 scene.lights = []
 sun = sphere(pos=vector(0,0,0), radius = 3.0E10, color = color.orange, emissive=True)
@@ -26,11 +34,23 @@ halley = as_obj(pos = vector(d_at_perihelion['halley'],0,0), radius = 0.5E10, m
 halley.v = vector(0, 0, - v_at_perihelion['halley'])
 
 stars = [earth, mars, halley]
+# only the sun pulls: it is the one body, fixed; the planets are test particles
+system = Gravity([[0, 0, 0]], [[0, 0, 0]], [mass['sun']], fixed=[True], G=G)
+planets = system.add_test_particles([[s.pos.x, s.pos.y, s.pos.z] for s in stars], [[s.v.x, s.v.y, s.v.z] for s in stars])
+r, phase = np.random.uniform(3.3E11, 4.8E11, n_asteroids), np.random.uniform(0, 2 * np.pi, n_asteroids)
+u = np.sqrt(G * mass['sun'] / r) # circular orbits in the x-z plane, the same way round
+belt_pos = np.stack([r * np.cos(phase), 0 * r, r * np.sin(phase)], -1)
+belt_v = np.stack([u * np.sin(phase), 0 * r, -u * np.cos(phase)], -1)
+asteroids = system.add_test_particles(belt_pos, belt_v)
+if n_asteroids:
+    belt = BulkRenderer(system.pos[asteroids], 2.0E9, color=color.gray(0.7), canvas=scene)
+
 dt=60*60*6
+steps_per_frame = 20 # the old rate(1000) steps per second, drawn 50 times a second
 print(earth.potential_energy(), earth.kinetic_energy())
 while True:
-    rate(1000)
-    for star in stars:
-        star.a = G_force(star.m, star.pos) / star.m
-        star.v = star.v + star.a * dt
-        star.pos = star.pos + star.v * dt
\ No newline at end of file
+    rate(50)
+    system.step(dt, steps_per_frame)
+    system.sync(stars, planets)
+    if n_asteroids:
+        belt.update(system.pos[asteroids])
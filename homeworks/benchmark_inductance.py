@@ -0,0 +1,47 @@
+import math
+import os
+import sys
+import numpy as np
+from inductance import *
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vptools.timing import timed
+
+
+def mutual_inductance_loop(
+    radius_src, radius_dst, height, n_seg=1200, n_rings=120, n_phi=240
+):
+    """The original kernel of hw09: Python loops over rings and angles."""
+    theta = np.linspace(0.0, 2 * math.pi, n_seg, endpoint=False)
+    dtheta = 2 * math.pi / n_seg
+    x_seg, y_seg = radius_src * np.cos(theta), radius_src * np.sin(theta)
+    dl_x = -radius_src * np.sin(theta) * dtheta
+    dl_y = radius_src * np.cos(theta) * dtheta
+
+    rho_edges = np.linspace(0.0, radius_dst, n_rings + 1)
+    flux = 0.0
+    for i in range(n_rings):
+        rho_mid = 0.5 * (rho_edges[i] + rho_edges[i + 1])
+        area_ring = math.pi * (rho_edges[i + 1] ** 2 - rho_edges[i] ** 2)
+        phi = np.linspace(0.0, 2 * math.pi, n_phi, endpoint=False)
+        bz_sum = 0.0
+        for ang in phi:
+            rx, ry = rho_mid * math.cos(ang) - x_seg, rho_mid * math.sin(ang) - y_seg
+            r_sq = rx * rx + ry * ry + height * height
+            bz_sum += np.sum((dl_x * ry - dl_y * rx) / r_sq**1.5)
+        flux += (MU0 / (4 * math.pi)) * (bz_sum / n_phi) * area_ring
+    return flux
+
+
+# the loops of hw09, both ways round
+cases = [(0.12, 0.06, 0.10), (0.06, 0.12, -0.10)]
+print(
+    f"{'case':>22} {'loops (s)':>10} {'vectorized (ms)':>16} {'M (nH)':>12} {'rel. diff':>10}"
+)
+for case in cases:
+    t_loop, M_loop = timed(mutual_inductance_loop, *case, repeat=1)
+    t_vec, M_vec = timed(mutual_inductance, *case, "brute")
+    print(
+        f"{str(case):>22} {t_loop:10.2f} {t_vec * 1e3:16.2f} {M_vec * 1e9:12.6f}"
+        f" {abs(M_vec - M_loop) / abs(M_loop):10.1e}"
+    )
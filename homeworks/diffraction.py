@@ -0,0 +1,193 @@
+import numpy as np
+from scipy.optimize import curve_fit
+from scipy.special import j1
+
+AIRY_ZERO = 3.8317059702075125  # first zero of J1: the dark ring is at AIRY_ZERO / a
+
+
+def aperture_grid(d, N):
+    """Cell centres of an N x N grid spanning [-d/2, d/2]^2, as meshgrid X, Y."""
+    dx = d / N
+    x = np.linspace(-d / 2 + dx / 2, d / 2 - dx / 2, N)
+    return np.meshgrid(x, x)
+
+
+def direct_sum(X_src, Y_src, theta_x, theta_y, k):
+    """Real part of the far field, sum of cos(k (theta_x X + theta_y Y)) over the
+    sources / number of sources, one source at a time (the original hw12 loop).
+    """
+    E_field = np.zeros_like(theta_x)
+    for X0, Y0 in zip(X_src, Y_src):
+        E_field += np.cos(k * (theta_x * X0 + theta_y * Y0))
+    return E_field / len(X_src)
+
+
+def matrix_sum(X_src, Y_src, theta_x, theta_y, k, dtype=np.float64, chunk=2048):
+    """The complex far field of point sources on a grid of directions, by GEMMs.
+
+    E[j, i] = sum over sources of exp(-i k (theta_x[i] X + theta_y[j] Y)) / M.
+    The phase splits as a + b with a = k theta_x X, b = k theta_y Y, so
+    cos(a + b) = cos b cos a - sin b sin a is a product of (sources x directions)
+    matrices, and likewise sin(a + b). Sources go chunk at a time, so memory
+    is about 4 chunk (len(theta_x) + len(theta_y)) numbers plus the result.
+    dtype=np.float32 does the products in single precision (chunks are still
+    summed in double).
+    """
+    X_src, Y_src = np.ravel(X_src), np.ravel(Y_src)
+    E = np.zeros((len(theta_y), len(theta_x)), dtype=complex)
+    for start in range(0, len(X_src), chunk):
+        a = k * np.outer(X_src[start : start + chunk], theta_x)
+        b = k * np.outer(Y_src[start : start + chunk], theta_y)
+        cos_a, sin_a = np.cos(a).astype(dtype), np.sin(a).astype(dtype)
+        cos_b, sin_b = np.cos(b).astype(dtype), np.sin(b).astype(dtype)
+        left = np.concatenate([cos_b, sin_b]).T  # (directions y, 2 chunk)
+        E.real += left @ np.concatenate([cos_a, -sin_a])
+        E.imag -= left @ np.concatenate([sin_a, cos_a])
+    return E / len(X_src)
+
+
+def fraunhofer(mask, x0, dx, lam, n_fft=2048, theta_max=None):
+    """Far field of an aperture mask by a zero-padded 2D FFT.
+
+    mask[j, i] is the aperture at (x0 + i dx, x0 + j dx) (rows along y, as from
+    np.meshgrid). Returns theta (1D, increasing) and the complex field
+    E[j, i] at (theta_x, theta_y) = (theta[i], theta[j]), normalized like
+    direct_sum: E = sum over the open cells of exp(-i k (theta_x X + theta_y Y)) / M.
+    The angle step is lam / (n_fft dx); theta_max crops to |theta| <= theta_max.
+    """
+    mask = np.asarray(mask, dtype=float)
+    f = np.fft.fftshift(np.fft.fftfreq(n_fft, dx))  # spatial frequency, 1/m
+    theta = lam * f  # k theta X = 2 pi f X
+    E = np.fft.fftshift(np.fft.fft2(mask, (n_fft, n_fft)))
+    keep = slice(None)
+    if theta_max is not None:
+        inside = np.nonzero(np.abs(theta) <= theta_max)[0]
+        keep = slice(inside[0], inside[-1] + 1)
+        theta, E = theta[keep], E[keep, keep]
+    shift = np.exp(-2j * np.pi * f[keep] * x0)  # the FFT puts the first cell at 0
+    return theta, E * shift[:, None] * shift[None, :] / np.sum(mask)
+
+
+def radial_profile(image, theta, step=None):
+    """Azimuthal average of image[j, i], taken at (theta[i], theta[j]).
+
+    Rings are step wide (default: the grid step) around theta = 0. Returns the
+    mean radius and the mean value of each ring.
+    """
+    step = theta[1] - theta[0] if step is None else step
+    r = np.hypot(*np.meshgrid(theta, theta)).ravel()
+    ring = np.floor(r / step + 0.5).astype(int)
+    count = np.maximum(np.bincount(ring), 1)
+    return np.bincount(ring, r) / count, np.bincount(ring, np.ravel(image)) / count
+
+
+def first_dark_ring(I, theta, refine=2):
+    """Angle of the first minimum of the intensity image I, finer than the grid.
+
+    The first ring-averaged minimum gives a first guess. The amplitude sqrt(I),
+    negated beyond the guess, crosses zero linearly there, so its ring average
+    is interpolated by a cubic through the four rings around the sign change
+    and solved for the root; this is repeated refine times with the new guess.
+    """
+    r, profile = radial_profile(I, theta)
+    low = (profile[1:-1] <= profile[:-2]) & (profile[1:-1] <= profile[2:])
+    low &= profile[1:-1] < 0.1 * profile[0]  # not a ripple of the central peak
+    guess = r[np.argmax(low) + 1]
+    radius = np.hypot(*np.meshgrid(theta, theta))
+    for _ in range(refine):
+        amplitude = np.sqrt(I) * np.where(radius > guess, -1, 1)
+        r, profile = radial_profile(amplitude, theta)
+        j = np.argmax(profile < 0) - 1  # the last ring before the sign change
+        near = slice(max(j - 1, 0), j + 3)
+        roots = np.roots(np.polyfit(r[near] - r[j], profile[near], 3))
+        roots = roots[np.isreal(roots)].real
+        guess = r[j] + roots[np.argmin(np.abs(roots))]
+    return guess
+
+
+def airy(theta, I0, a):
+    """I0 (2 J1(x) / x)**2 with x = a theta."""
+    x = a * np.asarray(theta, dtype=float)
+    out = np.ones_like(x)
+    nonzero = x != 0
+    out[nonzero] = 2 * j1(x[nonzero]) / x[nonzero]
+    return I0 * out**2
+
+
+def airy_fit(I, theta, theta_dark=None):
+    """Least-squares Airy pattern through the pixels of I inside 1.3 theta_dark.
+
+    Returns (I0, angle of the first dark ring). Fitting the pixels, rather than
+    ring averages, keeps the model exact at every sample.
+    """
+    theta_dark = first_dark_ring(I, theta) if theta_dark is None else theta_dark
+    radius = np.hypot(*np.meshgrid(theta, theta))
+    inside = radius < 1.3 * theta_dark
+    (I0, a), _ = curve_fit(
+        airy, radius[inside], I[inside], p0=(I.max(), AIRY_ZERO / theta_dark)
+    )
+    return I0, AIRY_ZERO / a
+
+
+if __name__ == "__main__":  # the circular hole of hw12, checked against the direct sum
+    import time
+
+    lam, d, N = 500e-9, 100e-6, 100
+    X, Y = aperture_grid(d, N)
+    mask = X**2 + Y**2 <= (d / 2) ** 2
+    x0, dx = X[0, 0], d / N
+
+    start = time.perf_counter()
+    theta, E = fraunhofer(mask, x0, dx, lam, theta_max=0.01 * np.pi)
+    print(f"FFT: {len(theta)}^2 directions in {time.perf_counter() - start:.3f} s")
+    assert np.max(np.abs(E.imag)) < 1e-12  # a symmetric hole gives a real field
+
+    sample = slice(None, None, 16)
+    theta_x, theta_y = np.meshgrid(theta[sample], theta[sample])
+    start = time.perf_counter()
+    E_direct = direct_sum(X[mask], Y[mask], theta_x, theta_y, 2 * np.pi / lam)
+    print(f"direct: {len(theta_x)}^2 directions in {time.perf_counter() - start:.3f} s")
+    assert np.max(np.abs(E[sample, sample].real - E_direct)) < 1e-10
+
+    # an off-centre slit: the FFT field still matches the complex direct sum
+    slit = (np.abs(X - 0.2 * d) < 0.1 * d) & (np.abs(Y) < 0.4 * d)
+    theta, E = fraunhofer(slit, x0, dx, lam, n_fft=256, theta_max=0.02)
+    theta_x, theta_y = np.meshgrid(theta, theta)
+    phase = (
+        2 * np.pi / lam * (theta_x[..., None] * X[slit] + theta_y[..., None] * Y[slit])
+    )
+    assert np.allclose(E, np.mean(np.exp(-1j * phase), -1), atol=1e-12)
+    print("FFT field matches the direct sums")
+
+    # the matrix-product sum, on 2 x 10**4 random sources (any pattern works)
+    rng = np.random.default_rng(0)
+    X_src, Y_src = rng.uniform(-d / 2, d / 2, (2, 20000))
+    theta = np.linspace(-0.01, 0.01, 256)
+    k = 2 * np.pi / lam
+    E = {}
+    for dtype in np.float64, np.float32:
+        start = time.perf_counter()
+        E[dtype] = matrix_sum(X_src, Y_src, theta, theta, k, dtype)
+        elapsed = time.perf_counter() - start
+        print(f"GEMM sum, {dtype.__name__}: 20000 sources x 256^2 in {elapsed:.3f} s")
+    sample = slice(None, None, 32)
+    theta_x, theta_y = np.meshgrid(theta[sample], theta[sample])
+    phase = k * (theta_x[..., None] * X_src + theta_y[..., None] * Y_src)
+    exact = np.mean(np.exp(-1j * phase), -1)
+    assert np.max(np.abs(E[np.float64][sample, sample] - exact)) < 1e-12
+    assert np.max(np.abs(E[np.float32][sample, sample] - exact)) < 1e-5
+
+    # the first dark ring, against 1.2197 lam / d for the hole the grid really has
+    d_grid = np.sqrt(4 * np.sum(mask) / np.pi) * dx
+    rayleigh = AIRY_ZERO / np.pi * lam / d_grid
+    print("  n_fft  grid step  first minimum  Airy fit   (relative errors)")
+    for n_fft in 256, 512, 2048:
+        theta, E = fraunhofer(mask, x0, dx, lam, n_fft, theta_max=0.01 * np.pi)
+        I = np.abs(E) ** 2
+        dark = first_dark_ring(I, theta)
+        _, fit = airy_fit(I, theta, dark)
+        step = (theta[1] - theta[0]) / rayleigh
+        print(
+            f"{n_fft:7} {step:10.3f} {dark / rayleigh - 1:14.1e} {fit / rayleigh - 1:9.1e}"
+        )
+        assert abs(fit / rayleigh - 1) < 1e-4
@@ -0,0 +1,250 @@
+from functools import lru_cache
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz  # np.trapz before numpy 2.0
+
+
+def _second_difference(n):  # 1D 5-point stencil part, times h**2
+    return sp.diags([np.ones(n - 1), -2 * np.ones(n), np.ones(n - 1)], [-1, 0, 1])
+
+
+class DirichletProblem:
+    """Laplace's equation on a grid whose u_cond nodes and outer edge are fixed.
+
+    The 5-point Laplacian is assembled once over the free nodes; the fixed nodes
+    only enter the right-hand side, so electrodes can be set to any voltages
+    without assembling (or factorizing) again.
+    """
+
+    def __init__(self, u_cond):
+        fixed = np.array(u_cond, dtype=bool)
+        fixed[0, :] = fixed[-1, :] = fixed[:, 0] = fixed[:, -1] = True
+        self.shape = fixed.shape
+        self.fixed = fixed.ravel()
+        self.free = ~self.fixed
+        n, m = self.shape
+        laplacian = sp.kronsum(_second_difference(m), _second_difference(n)).tocsr()
+        rows = -laplacian[self.free]
+        self.A = rows[:, self.free].tocsc()  # symmetric positive definite
+        self.B = rows[:, self.fixed].tocsr()  # coupling of free nodes to fixed ones
+        self._lu = None
+        self._preconditioners = {}
+
+    def rhs(self, u):
+        return -(self.B @ np.asarray(u, dtype=float).ravel()[self.fixed])
+
+    def preconditioner(self, kind="ilu"):
+        """M ~ A**-1: "jacobi" (symmetric, for CG) or "ilu" (incomplete LU, which
+        is not symmetric, so only for BiCGSTAB).
+        """
+        if kind not in self._preconditioners:
+            if kind == "ilu":
+                ilu = spla.spilu(self.A, drop_tol=1e-4, fill_factor=100)
+                M = spla.LinearOperator(self.A.shape, ilu.solve)
+            elif kind == "jacobi":
+                M = sp.diags(1 / self.A.diagonal())
+            else:
+                raise ValueError(f"unknown preconditioner {kind!r}")
+            self._preconditioners[kind] = M
+        return self._preconditioners[kind]
+
+    def solve(self, u, method="direct", tol=1e-10, preconditioner=None):
+        """V with V = u on the fixed nodes. method is "direct" (cached sparse LU),
+        "cg" (conjugate gradients, Jacobi preconditioned) or "bicgstab" (ILU
+        preconditioned by default), the last two to a relative tolerance tol.
+        """
+        b = self.rhs(u)
+        if method == "direct":
+            if self._lu is None:
+                self._lu = spla.splu(self.A)
+            x = self._lu.solve(b)
+        elif method in ("cg", "bicgstab"):
+            if preconditioner is None:
+                preconditioner = "jacobi" if method == "cg" else "ilu"
+            if method == "cg" and preconditioner == "ilu":
+                raise ValueError("CG needs a symmetric preconditioner, not ILU")
+            iterate = spla.cg if method == "cg" else spla.bicgstab
+            x, info = iterate(
+                self.A,
+                b,
+                rtol=tol,
+                atol=0.0,
+                M=self.preconditioner(preconditioner),
+                maxiter=10 * max(self.shape),
+            )
+            if info != 0:
+                raise RuntimeError(f"{method} did not converge ({info})")
+        else:
+            raise ValueError(f"unknown method {method!r}")
+        V = np.asarray(u, dtype=float).ravel().copy()
+        V[self.free] = x
+        return V.reshape(self.shape)
+
+
+@lru_cache(maxsize=4)  # each may hold a sparse LU factorization
+def _problem(shape, mask_bytes):
+    return DirichletProblem(np.frombuffer(mask_bytes, dtype=bool).reshape(shape))
+
+
+def problem_for(u_cond):
+    """The DirichletProblem of this mask, shared by all solves with the same mask."""
+    u_cond = np.ascontiguousarray(u_cond, dtype=bool)
+    return _problem(u_cond.shape, u_cond.tobytes())
+
+
+def solve(u, u_cond, h, method="direct", tol=1e-10, preconditioner=None):
+    """Drop-in for the solvers in laplace.py: V with V = u on u_cond and the edge."""
+    return problem_for(u_cond).solve(u, method, tol, preconditioner)
+
+
+def plates(N, h, L, d, V0):
+    """u and u_cond of the hw07 capacitor: plates of length L, d apart, at -V0/2 and V0/2."""
+    u = np.zeros([N, N])
+    rows = slice(int(N / 2) - int(L / h / 2.0), int(N / 2) + int(L / h / 2.0))
+    u[rows, int(N / 2) - int(d / h / 2.0)] = -V0 / 2
+    u[rows, int(N / 2) + int(d / h / 2.0)] = V0 / 2
+    return u, u != 0
+
+
+def _contour(electrode, others):
+    # box around the electrode, grown halfway to the nearest other conductor
+    # (or to one node inside the grid edge), as (i0, i1, j0, j1) inclusive
+    i, j = np.nonzero(electrode)
+    i0, i1, j0, j1 = i.min(), i.max(), j.min(), j.max()
+    n, m = electrode.shape
+    pad = min(i0, j0, n - 1 - i1, m - 1 - j1) - 1
+    oi, oj = np.nonzero(others)
+    if len(oi):
+        gap = np.maximum(
+            np.maximum(i0 - oi, oi - i1), np.maximum(j0 - oj, oj - j1)
+        )  # Chebyshev distance from the box
+        pad = min(pad, gap.min() // 2)
+    if pad < 1:
+        raise ValueError("no room for a contour around the electrode")
+    return i0 - pad, i1 + pad, j0 - pad, j1 + pad
+
+
+def _charge(V, mask, epsilon):
+    # Gauss's law on the grid: epsilon (4 V - its 4 neighbours), over the mask
+    # (in 2D, per unit length, the h of the flux and the 1/h of E cancel)
+    q = np.zeros_like(V)
+    q[1:-1, 1:-1] = 4 * V[1:-1, 1:-1] - V[:-2, 1:-1] - V[2:, 1:-1]
+    q[1:-1, 1:-1] -= V[1:-1, :-2] + V[1:-1, 2:]
+    return epsilon * np.sum(q[mask])
+
+
+def _unit_potentials(u_cond, conductors):
+    # V with one conductor at 1 V and the others and the edge at 0 V, for each
+    problem = problem_for(u_cond)
+    return [problem.solve(np.asarray(mask, dtype=float)) for mask in conductors]
+
+
+def capacitance_matrix(u_cond, conductors, epsilon=8.854e-12):
+    """Maxwell capacitance matrix (per unit length) of conductor masks in u_cond.
+
+    Q_i = sum over j of C[i, j] V_j, with the grid edge grounded. Column j is
+    the charge on each conductor when conductor j is at 1 V and the rest at 0 V,
+    so it depends on the geometry only.
+    """
+    conductors = [np.asarray(mask, dtype=bool) for mask in conductors]
+    unit = _unit_potentials(u_cond, conductors)
+    return np.array([[_charge(V, mask, epsilon) for V in unit] for mask in conductors])
+
+
+def capacitance(u_cond, h, electrode_mask, epsilon=8.854e-12):
+    """Capacitance (per unit length) of the electrode against the other conductors.
+
+    The other conductors of u_cond act as one terminal, and the grounded edge
+    is left floating: with C the 2 x 2 Maxwell matrix and g = its row sums (the
+    capacitances to the edge), C_12 = -C[0, 1] + g0 g1 / (g0 + g1). Without
+    other conductors it is the capacitance to the edge. The field of 1 V
+    across the terminals, at zero net charge on the edge, gives two estimates
+    of it: (epsilon times the flux of E through a rectangle around the
+    electrode, 2W with W = epsilon/2 * sum of (V difference)**2 over every grid
+    edge). Both depend on the geometry only, not on the voltages of a solution.
+    """
+    electrode = np.asarray(electrode_mask, dtype=bool)
+    others = np.asarray(u_cond, dtype=bool) & ~electrode
+    if others.any():
+        unit = _unit_potentials(u_cond, [electrode, others])
+        ground = [
+            sum(_charge(V, mask, epsilon) for V in unit) for mask in (electrode, others)
+        ]
+        a = ground[1] / (
+            ground[0] + ground[1]
+        )  # the electrode at a, the others at a - 1
+        V = a * unit[0] + (a - 1) * unit[1]
+    else:
+        (V,) = _unit_potentials(u_cond, [electrode])
+
+    Ex, Ey = np.gradient(V, h)
+    Ex, Ey = -Ex, -Ey
+    i0, i1, j0, j1 = _contour(electrode, others)
+    flux = _trapezoid(Ex[i1, j0 : j1 + 1] - Ex[i0, j0 : j1 + 1], dx=h) + _trapezoid(
+        Ey[i0 : i1 + 1, j1] - Ey[i0 : i1 + 1, j0], dx=h
+    )
+    W = (
+        0.5
+        * epsilon
+        * (np.sum(np.diff(V, axis=0) ** 2) + np.sum(np.diff(V, axis=1) ** 2))
+    )
+    return epsilon * flux, 2 * W
+
+
+if __name__ == "__main__":
+    import time
+    from laplace import residual, solve_multigrid_cg
+
+    N, V0 = 101, 200
+    h = 1e-2 / (N - 1)
+    u, u_cond = plates(N, h, 4e-3, 1e-3, V0)
+    V = solve(u, u_cond, h)
+    assert residual(V, u_cond) < 1e-10
+    for method, kind in ("cg", "jacobi"), ("bicgstab", "ilu"), ("bicgstab", "jacobi"):
+        V_iterative = solve(u, u_cond, h, method=method, preconditioner=kind)
+        assert np.max(np.abs(V - V_iterative)) < 1e-6
+    assert np.max(np.abs(V - solve_multigrid_cg(u, u_cond, h, tol=1e-10))) < 1e-6
+    # other voltages on the same plates reuse the factorization
+    assert np.allclose(solve(3 * u, u_cond, h), 3 * V)
+
+    # symmetric plates at -V0/2 and V0/2 carry Q = C V0
+    C_flux, C_energy = capacitance(u_cond, h, u < 0)
+    assert abs(C_flux / C_energy - 1) < 1e-6
+    assert abs(_charge(V, u > 0, 8.854e-12) / V0 / C_energy - 1) < 1e-9
+
+    # unequal plates: the same C from either plate, and from the Maxwell matrix
+    u_cond = plates(N, h, 4e-3, 1e-3, V0)[1]
+    u_cond[:, : N // 2] &= plates(N, h, 2e-3, 1e-3, V0)[1][:, : N // 2]
+    lower, upper = u_cond & (np.arange(N) < N // 2), u_cond & (np.arange(N) > N // 2)
+    C = capacitance_matrix(u_cond, [lower, upper])
+    g = C.sum(1)
+    C_12 = -C[0, 1] + g[0] * g[1] / g.sum()
+    assert abs(C[0, 1] / C[1, 0] - 1) < 1e-9
+    for electrode in lower, upper:
+        assert np.allclose(capacitance(u_cond, h, electrode), C_12, rtol=1e-6, atol=0)
+
+    # C against the ideal epsilon L / d, for plates of many lengths and gaps
+    Ls, ds = np.meshgrid(
+        np.arange(2e-3, 8.1e-3, 0.5e-3), np.arange(0.5e-3, 3.1e-3, 0.25e-3)
+    )
+    C = np.zeros(Ls.shape + (2,))
+    start = time.perf_counter()
+    for index in np.ndindex(Ls.shape):
+        u, u_cond = plates(N, h, Ls[index], ds[index], V0)
+        C[index] = capacitance(u_cond, h, u < 0)
+    elapsed = time.perf_counter() - start
+    d_grid = 2 * np.floor(ds / h / 2) * h  # the gap the grid actually has
+    C_ideal = 8.854e-12 * Ls / d_grid
+    error = 100 * (C / C_ideal[..., None] - 1)
+    print(f"{Ls.size} capacitors, {elapsed / Ls.size * 1e3:.1f} ms each")
+    print("L/d    C_flux/C_ideal - 1   C_energy/C_ideal - 1")
+    order = np.argsort((Ls / d_grid).ravel())
+    rows = np.column_stack([(Ls / d_grid).ravel(), error.reshape(-1, 2)])[order]
+    print(
+        "\n".join(
+            f"{r[0]:5.2f}  {r[1]:8.2f} %   {r[2]:8.2f} %"
+            for r in rows[:: len(rows) // 12]
+        )
+    )
@@ -1,5 +1,15 @@
+import os
+import sys
 from math import pi
-from vpython import *
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vptools.gravity import Gravity
+from vptools.runmode import RunMode
+
+mode = RunMode.from_args()  # --headless prints three precession periods and stops
+if not mode.headless:
+    from vpython import *
 
 G = 6.6743e-11
 mass = {"earth": 5.97e24, "moon": 7.36e22, "sun": 1.99e30}
@@ -12,136 +22,123 @@ earth_orbit = {"r": 1.495e11, "v": 2.9783e4}
 moon_orbit = {"r": 3.84e8, "v": 1.022e3}
 theta = 5.145 * pi / 180.0
 
-
-def G_force(m1, m2, pos_vec):
-    return -G * m1 * m2 / mag2(pos_vec) * norm(pos_vec)
-
-
-scene = canvas(
-    align="left",
-    center=vec(0, -0.5, 0),
-    height=900,
-    width=900,
-    background=vec(0.5, 0.5, 0),
-)
-
-textscene = canvas(
-    align="right",
-    center=vec(0, 0, 0),
-    height=500,
-    width=500,
-    range=250,
-    background=vec(0, 0.5, 0.5),
-)
-# scene.forward = vector(0, -1, 0)
-
+# sun, earth, moon as rows of (3, 3) arrays; the sun stays at the origin
+tilt = np.array([np.cos(theta), -np.sin(theta), 0])
 earth_center = -moon_orbit["r"] * mass["moon"] / (mass["earth"] + mass["moon"])
-earth_initial_pos = vector(
-    earth_center * cos(theta), -earth_center * sin(theta), 0
-) + vector(earth_orbit["r"], 0, 0)
-earth_initial_v = vector(0, 0, moon_orbit["v"] * mass["moon"] / mass["earth"]) + vector(
-    0, 0, -earth_orbit["v"]
-)
-
-earth = sphere(
-    canvas=scene,
-    radius=radius["earth"],
-    m=mass["earth"],
-    pos=earth_initial_pos,
-    v=earth_initial_v,
-    texture={"file": textures.earth},
-)
-
 moon_center = moon_orbit["r"] * mass["earth"] / (mass["earth"] + mass["moon"])
-moon_initial_pos = vector(
-    moon_center * cos(theta), -moon_center * sin(theta), 0
-) + vector(earth_orbit["r"], 0, 0)
-moon_initial_v = vector(0, 0, -moon_orbit["v"]) + vector(0, 0, -earth_orbit["v"])
-
-moon = sphere(
-    canvas=scene,
-    radius=radius["moon"],
-    pos=moon_initial_pos,
-    v=moon_initial_v,
-    m=mass["moon"],
+pos = [
+    [0, 0, 0],
+    earth_center * tilt + [earth_orbit["r"], 0, 0],
+    moon_center * tilt + [earth_orbit["r"], 0, 0],
+]
+vel = [
+    [0, 0, 0],
+    [0, 0, moon_orbit["v"] * mass["moon"] / mass["earth"] - earth_orbit["v"]],
+    [0, 0, -moon_orbit["v"] - earth_orbit["v"]],
+]
+bodies = Gravity(
+    pos,
+    vel,
+    [mass["sun"], mass["earth"], mass["moon"]],
+    fixed=[True, False, False],
+    G=G,
 )
+SUN, EARTH, MOON = range(3)
+
+if not mode.headless:
+    scene = canvas(
+        align="left",
+        center=vec(0, -0.5, 0),
+        height=900,
+        width=900,
+        background=vec(0.5, 0.5, 0),
+    )
 
-sun = sphere(
-    canvas=scene,
-    pos=vector(0, 0, 0),
-    radius=radius["sun"],
-    m=mass["sun"],
-    color=color.orange,
-    emissive=True,
-)
+    textscene = canvas(
+        align="right",
+        center=vec(0, 0, 0),
+        height=500,
+        width=500,
+        range=250,
+        background=vec(0, 0.5, 0.5),
+    )
+    # scene.forward = vector(0, -1, 0)
 
-scene.light = []
-local_light(
-    pos=vector(0, 0, 0),
-    canvas=scene,
-)
+    earth = sphere(
+        canvas=scene, radius=radius["earth"], texture={"file": textures.earth}
+    )
+    moon = sphere(canvas=scene, radius=radius["moon"])
+    sun = sphere(
+        canvas=scene,
+        pos=vector(0, 0, 0),
+        radius=radius["sun"],
+        color=color.orange,
+        emissive=True,
+    )
+    bodies.sync([earth, moon], [EARTH, MOON])
 
-arrow_moon = arrow(color=color.white, shaftwidth=900000, canvas=scene)
-arrow_earth = arrow(color=color.yellow, shaftwidth=500000, canvas=scene)
-arrow_earth.axis = vector(0, 2 * radius["earth"], 0)
+    scene.light = []
+    local_light(
+        pos=vector(0, 0, 0),
+        canvas=scene,
+    )
+
+    arrow_moon = arrow(color=color.white, shaftwidth=900000, canvas=scene)
+    arrow_earth = arrow(color=color.yellow, shaftwidth=500000, canvas=scene)
+    arrow_earth.axis = vector(0, 2 * radius["earth"], 0)
 
 t = 0
 dt = 60 * 60 * 8
 
 record = 0
 recorded = False
-print_val = 0
-text(
-    canvas=textscene,
-    text="Calculating period of the precession of moon’s orbit:",
-    pos=vector(-200, 150, 0),
-    height=13,
-    color=color.white,
-)
-textpos = vector(-200, 120, 0)
-
-
-while True:
-    t += dt
-    rate(1000)
-    moon.a = (
-        G_force(mass["moon"], mass["earth"], moon.pos - earth.pos) / mass["moon"]
-        + G_force(mass["moon"], mass["sun"], moon.pos - sun.pos) / mass["moon"]
+periods = 0
+if not mode.headless:
+    text(
+        canvas=textscene,
+        text="Calculating period of the precession of moon’s orbit:",
+        pos=vector(-200, 150, 0),
+        height=13,
+        color=color.white,
     )
-    earth.a = (
-        G_force(mass["earth"], mass["moon"], earth.pos - moon.pos) / mass["earth"]
-        + G_force(mass["earth"], mass["sun"], earth.pos - sun.pos) / mass["earth"]
-    )
-
-    moon.v += moon.a * dt
-    moon.pos += moon.v * dt
+    textpos = vector(-200, 120, 0)
 
-    earth.v += earth.a * dt
-    earth.pos += earth.v * dt
 
-    scene.center = earth.pos
-    arrow_moon.pos = earth.pos
-    arrow_earth.pos = earth.pos
-    arrow_moon.axis = (
-        0.3
-        * moon_orbit["r"]
-        * cross(norm(moon.pos - earth.pos), norm(moon.v - earth.v))
-    )
-
-    if arrow_moon.axis.x > 0 and arrow_moon.axis.z < 0 and recorded == False:
+step = 0
+while not (mode.headless and periods == 3):
+    t += dt
+    step += 1
+    mode.rate(1000, step)
+    bodies.step(dt)
+
+    # the normal of the moon's orbit around the earth (the white arrow)
+    r = bodies.pos[MOON] - bodies.pos[EARTH]
+    v = bodies.vel[MOON] - bodies.vel[EARTH]
+    normal = np.cross(r / np.linalg.norm(r), v / np.linalg.norm(v))
+
+    if mode.render(step):
+        bodies.sync([earth, moon], [EARTH, MOON])
+        scene.center = earth.pos
+        arrow_moon.pos = earth.pos
+        arrow_earth.pos = earth.pos
+        arrow_moon.axis = 0.3 * moon_orbit["r"] * vector(*normal)
+
+    if normal[0] > 0 and normal[2] < 0 and recorded == False:
         recorded = True
         if record != 0 and (t - record) / 60 / 60 / 24 > 365:
             print(str((t - record) / 60 / 60 / 24) + " days")
-            print_str = str((t - record) / 60 / 60 / 24)
-            text(
-                canvas=textscene,
-                text="Period of the precession: " + print_str + " days",
-                pos=textpos,
-                height=12,
-                color=color.white,
-            )
-            textpos += vec(0, -20, 0)
+            periods += 1
+            if not mode.headless:
+                print_str = str((t - record) / 60 / 60 / 24)
+                text(
+                    canvas=textscene,
+                    text="Period of the precession: " + print_str + " days",
+                    pos=textpos,
+                    height=12,
+                    color=color.white,
+                )
+                textpos += vec(0, -20, 0)
         record = t
 
-    elif arrow_moon.axis.x < 0:
+    elif normal[0] < 0:
         recorded = False
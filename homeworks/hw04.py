@@ -1,5 +1,12 @@
+import os
+import sys
+from functools import partial
 import numpy as np
-from vpython import *
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vptools.runmode import RunMode
+from vptools.sweep import sweep
+from spring_chain import *
 
 # 定義系統參數
 A, N = 0.10, 50
@@ -17,51 +24,44 @@ connectors = [Particle() for i in range(N - 1)]
 # 初始化時間參數
 time, time_step = 0, 0.0003
 
-# 設定繪圖參數
-graph_view = graph(
-    width=1000,
-    height=500,
-    align="left",
-    xtitle="Wave Vector (k)",
-    ytitle="Angular Frequency (ω)",
-)
-frequency_curve = gcurve(graph=graph_view, color=color.red, width=3)
-
-# 探索不同波向量模式
-for mode_index in arange(1, N / 2 - 1, 1.0):
-    wave_unit = 2 * np.pi / (N * d)
-    wave_vector = mode_index * wave_unit
-    initial_phase = wave_vector * np.arange(N) * d
-
-    # 初始化粒子狀態
-    ball_pos = np.arange(N) * d + A * np.sin(initial_phase)
-    ball_orig = np.arange(N) * d
-    velocities = np.zeros(N)
-    spring_len = np.ones(N) * d
-
-    wave_count = 0
-    time = 0
-
-    # 開始模擬
-    while wave_count < 10:
-        time += time_step
-        spring_len[:-1] = ball_pos[1:] - ball_pos[:-1]
-        velocities[1:] += (spring_len[1:] - spring_len[:-1]) * k / m * time_step
-
-        # 週期性邊界條件處理
-        spring_len[-1] = ball_pos[0] - ball_pos[-1] + N * d
-        velocities[0] += (spring_len[0] - spring_len[-1]) * k / m * time_step
+# 各模態的模擬交給多個行程同時跑, 行程會重新載入本檔, 所以主程式放在 __main__ 之下
+if __name__ == "__main__":
+    mode = RunMode.from_args()  # --headless 只輸出數值，不建立圖表
+    if not mode.headless:
+        from vpython import *
 
-        # 計算波動次數
-        if (
-            ball_pos[0] * (ball_pos[0] + velocities[0] * time_step) < 0
-            and time > 5 * time_step
-        ):
-            wave_count += 0.5
+    # 設定繪圖參數
+    if not mode.headless:
+        graph_view = graph(
+            width=1000,
+            height=500,
+            align="left",
+            xtitle="Wave Vector (k)",
+            ytitle="Angular Frequency (ω)",
+        )
+        frequency_curve = gcurve(graph=graph_view, color=color.red, width=3)
+        normal_mode_curve = gcurve(graph=graph_view, color=color.blue, width=1)
 
-        # 更新粒子位置
-        ball_pos += velocities * time_step
+    # 以正則模態 (週期勁度矩陣的特徵值) 一次求出所有 ω(k)
+    mode_vectors, mode_omegas = normal_modes(N, m, k, d)
+    if mode.headless:
+        print("normal modes:")
+        for wave_vector, omega in zip(mode_vectors, mode_omegas):
+            print(wave_vector, omega)
+        print("time domain:")
+    else:
+        for wave_vector, omega in zip(mode_vectors, mode_omegas):
+            normal_mode_curve.plot(wave_vector, omega)
 
-    # 計算平均週期與繪圖
-    average_period = time / wave_count
-    frequency_curve.plot(wave_vector, 2.0 * np.pi / average_period)
+    # 探索不同波向量模式 (時域模擬, 用來驗證正則模態)
+    # 每個行程以 (模態 × N) 陣列一次積分一批模態, 結果依 k 的順序陸續畫出
+    # 由所有粒子的過零時刻擬合週期, ω 的信賴區間小於 rtol 即停止該模態
+    # (原本只數粒子 0 的 10 個週期, 見 simulate_modes)
+    measure = partial(measure_modes, N=N, m=m, k=k, d=d, A=A, time_step=time_step)
+    batches = np.array_split(np.arange(1, N / 2 - 1, 1.0), os.cpu_count())
+    for batch, (wave_vectors, omegas, _, _) in sweep(measure, batches):
+        for wave_vector, omega in zip(wave_vectors, omegas):
+            if mode.headless:
+                print(wave_vector, omega)
+            else:
+                frequency_curve.plot(wave_vector, omega)
@@ -0,0 +1,25 @@
+import os
+import sys
+import numpy as np
+from neighbors import *
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+from vptools.timing import timed
+
+size = 31e-12 * 10  # same atom size as main.py
+brute_force_limit = 4000  # the N x N x 3 array of brute force needs 24 * N**2 bytes
+
+
+print(f"{'N':>7} {'brute force (ms)':>18} {'cell list (ms)':>16} {'pairs':>7}")
+for N in [200, 500, 1000, 2000, 5000, 10000, 20000, 50000]:
+    L = ((24.4e-3 / (6e23)) * N) ** (1 / 3.0) / 2 + size  # same density as main.py
+    p_a = np.random.uniform(-L + size, L - size, (N, 3))
+
+    t_cell, (i, j) = timed(cell_list_pairs, p_a, 2 * size)
+    if N <= brute_force_limit:
+        t_brute, pairs = timed(brute_force_pairs, p_a, 2 * size)
+        assert np.array_equal(pairs[0], i) and np.array_equal(pairs[1], j)
+        brute = f"{t_brute * 1e3:18.2f}"
+    else:
+        brute = f"{'skipped':>18}"
+    print(f"{N:>7} {brute} {t_cell * 1e3:16.2f} {len(i):>7}")
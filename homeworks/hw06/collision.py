@@ -0,0 +1,39 @@
+import numpy as np
+
+
+def resolve_collisions(p_a, v_a, i, j):
+    """Elastic collisions of equal-mass atom pairs (i < j), applied to v_a in place.
+
+    Only approaching pairs collide. An atom can only take part in one collision
+    per round, so when an atom hits several others in the same step, the pairs
+    are resolved in rounds in (i, j) order: the first pair of every atom goes
+    first, and the rest are checked again with the updated velocities.
+    Returns the number of collisions handled.
+    """
+    N = len(p_a)
+    r_ij = p_a[i] - p_a[j]  # vector from atom j to atom i
+    r2 = np.sum(r_ij * r_ij, -1)
+    pair = np.arange(len(i))
+    collisions = 0
+
+    while len(pair):
+        v_ij = v_a[i[pair]] - v_a[j[pair]]
+        rv = np.sum(r_ij[pair] * v_ij, -1)
+        approaching = rv < 0  # only handling collision if two atoms are approaching
+        pair, rv = pair[approaching], rv[approaching]
+
+        # a pair goes in this round if it is the first remaining pair of both atoms
+        first = np.full(N, len(i))
+        np.minimum.at(first, i[pair], pair)
+        np.minimum.at(first, j[pair], pair)
+        now = (first[i[pair]] == pair) & (first[j[pair]] == pair)
+
+        hit = pair[now]
+        dv = (rv[now] / r2[hit])[:, np.newaxis] * r_ij[hit]
+        v_a[i[hit]] -= dv
+        v_a[j[hit]] += dv
+
+        collisions += len(hit)
+        pair = pair[~now]
+
+    return collisions
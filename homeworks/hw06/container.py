@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class Container:
+    """Box centred at the origin whose walls reflect atoms elastically.
+
+    half is the half length along x, y, z. wall_speed is the speed at which
+    both walls normal to each axis move towards the centre (0 for fixed walls).
+    """
+
+    def __init__(self, half, size, m):
+        self.half = np.array(half, dtype=float)
+        self.wall_speed = np.zeros(3)
+        self.size, self.m = size, m  # atom radius and mass
+
+    @property
+    def lengths(self):
+        return 2 * self.half
+
+    @property
+    def volume(self):
+        return np.prod(self.lengths)
+
+    @property
+    def face_areas(self):  # area of one face normal to x, y, z
+        length, height, width = self.lengths
+        return np.array([height * width, width * length, length * height])
+
+    @property
+    def area(self):
+        return 2 * np.sum(self.face_areas)
+
+    def move(self, dt):
+        self.half -= self.wall_speed * dt
+
+    def bounce(self, p_a, v_a):
+        """Reflect the atoms hitting a wall, updating v_a in place.
+
+        Returns the (outward) momentum given to each wall as a (3, 2) array:
+        one row per axis, with the -face in column 0 and the +face in column 1.
+        """
+        limit = self.half - self.size
+        u = self.wall_speed  # the -face moves with +u, the +face with -u
+        impulse = np.zeros((3, 2))
+
+        hit = (p_a <= -limit) & (v_a - u < 0)  # moving towards the -face
+        v_new = np.where(hit, 2 * u - v_a, v_a)
+        impulse[:, 0] = self.m * np.sum(np.where(hit, v_new - v_a, 0), 0)
+
+        hit = (p_a >= limit) & (v_new + u > 0)  # moving towards the +face
+        v_out = np.where(hit, -2 * u - v_new, v_new)
+        impulse[:, 1] = self.m * np.sum(np.where(hit, v_new - v_out, 0), 0)
+
+        v_a[:] = v_out
+        return impulse
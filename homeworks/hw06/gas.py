@@ -0,0 +1,88 @@
+import numpy as np
+from neighbors import *
+from collision import *
+
+
+class GasSimulation:
+    """Hard-sphere gas of equal atoms in a Container, advanced by step()."""
+
+    def __init__(self, p_a, v_a, walls, dt, size):
+        self.p_a, self.v_a = p_a, v_a  # (N, 3) positions and velocities
+        self.walls = walls
+        self.dt, self.size = dt, size
+        self.t = 0
+        self.delta_p = np.zeros((3, 2))  # momentum given to each wall, see Container
+
+    def step(self):
+        self.t += self.dt
+        self.walls.move(self.dt)
+        self.p_a += self.v_a * self.dt  # calculate new positions for all atoms
+
+        # find collisions between pairs of atoms, and handle their collisions
+        hit_i, hit_j = cell_list_pairs(self.p_a, 2 * self.size)
+        resolve_collisions(self.p_a, self.v_a, hit_i, hit_j)
+
+        # find collisions between the atoms and the walls
+        self.delta_p += self.walls.bounce(self.p_a, self.v_a)
+
+    def run(self, protocol):
+        """Step until the protocol is done, yielding the run count after each step."""
+        protocol.start(self)
+        runs = 0
+        while not protocol.done(self, runs):
+            self.step()
+            runs += 1
+            yield runs
+        protocol.finish(self)
+
+
+class Protocol:
+    """A stage of the experiment: sets up the walls, and says when it is over."""
+
+    def start(self, sim):
+        pass
+
+    def done(self, sim, runs):
+        return True
+
+    def finish(self, sim):
+        pass
+
+
+class IsothermalHold(Protocol):
+    """Keep the walls fixed for a number of runs."""
+
+    def __init__(self, runs):
+        self.runs = runs
+
+    def done(self, sim, runs):
+        return runs >= self.runs
+
+
+class AdiabaticCompression(Protocol):
+    """Move both walls of one axis inwards until the box is that short."""
+
+    def __init__(self, wall_speed, length, axis=0):
+        self.wall_speed, self.length, self.axis = wall_speed, length, axis
+
+    def start(self, sim):
+        sim.walls.wall_speed[self.axis] = self.wall_speed
+
+    def done(self, sim, runs):
+        return sim.walls.lengths[self.axis] < self.length
+
+    def finish(self, sim):
+        sim.walls.wall_speed[self.axis] = 0
+
+
+class FreeExpansion(Protocol):
+    """Move the walls out to half at once, then let the gas fill the box."""
+
+    def __init__(self, half, runs):
+        self.half, self.runs = half, runs
+
+    def start(self, sim):
+        sim.walls.half[:] = self.half
+
+    def done(self, sim, runs):
+        return runs >= self.runs
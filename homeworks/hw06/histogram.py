@@ -1,37 +1,63 @@
 import numpy as np
-import vpython as vp
 
 
-class ghistogram:
-    def __init__(self, graph, bins, color=vp.color.red):
+class Histogram:
+    """Running average of the counts per slot (slots starting at bins) over samples."""
+
+    def __init__(self, bins):
         self.bins = bins
         self.slotnumber = len(bins)
         self.slotwidth = bins[1] - bins[0]
-        self.n = 0
-        self.slots = np.zeros(len(bins))
-        self.bars = vp.gvbars(graph=graph, delta=self.slotwidth, color=color)
+        self.n = 0  # number of samples
+        self.counts = np.zeros(len(bins), dtype=np.int64)  # total counts of all samples
+
+    @property
+    def slots(self):  # running average of the counts over all samples
+        return self.counts / max(self.n, 1)
+
+    def add(self, data):
+        index = ((np.asarray(data) - self.bins[0]) / self.slotwidth).astype(int)
+        np.clip(index, 0, self.slotnumber - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.slotnumber)
+        self.n += 1
+
+
+class ghistogram(Histogram):
+    def __init__(self, graph, bins, color=None, redraw_every=1):
+        import vpython as vp
+
+        super().__init__(bins)
+        self.redraw_every = redraw_every  # redraw the bars every this many samples
+        self.bars = vp.gvbars(
+            graph=graph,
+            delta=self.slotwidth,
+            color=vp.color.red if color is None else color,
+        )
 
     def plot(self, data):
-        currentslots = np.zeros(self.slotnumber)
+        self.add(data)
+        if self.n == 1:
+            self.bars.plot(list(zip(self.bins, self.slots)))
+        elif self.n % self.redraw_every == 0:
+            self.bars.data = list(zip(self.bins, self.slots))
+
+
+if __name__ == "__main__":  # the counting only, so it runs without vpython
+    observation = Histogram(bins=np.arange(1, 3, 0.5))
+    samples = [[1.2, 2.3, 4], [1, 1.7, 2.6], [-0.5, 2, 2.3]]
+
+    # the running average with one Python loop per value, to check against
+    reference = np.zeros(observation.slotnumber)
+    for n, data in enumerate(samples):
+        observation.add(data)
+        currentslots = np.zeros(observation.slotnumber)
         for value in data:
             currentslots[
                 min(
-                    max(int((value - self.bins[0]) / self.slotwidth), 0),
-                    self.slotnumber - 1,
+                    max(int((value - observation.bins[0]) / observation.slotwidth), 0),
+                    observation.slotnumber - 1,
                 )
             ] += 1
-        self.slots = (self.slots * self.n + currentslots) / (self.n + 1)
-        self.n += 1
-        if self.n == 1:
-            for currentbin, barlength in zip(self.bins, self.slots):
-                self.bars.plot(pos=(currentbin, barlength))
-        else:
-            self.bars.data = list(zip(self.bins, self.slots))
-
-
-if __name__ == "__main__":
-    vdist = vp.graph(width=450)
-    observation = ghistogram(graph=vdist, bins=np.arange(1, 3, 0.5))
-    observation.plot(data=[1.2, 2.3, 4])
-    observation.plot(data=[1, 1.7, 2.6])
-    observation.plot(data=[-0.5, 2, 2.3])
+        reference = (reference * n + currentslots) / (n + 1)
+        assert np.allclose(observation.slots, reference), (observation.slots, reference)
+    print(observation.slots)
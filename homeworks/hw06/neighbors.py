@@ -0,0 +1,81 @@
+import numpy as np
+
+# the 27 cell offsets (-1, 0, 1)^3 around a cell, including the cell itself
+OFFSETS = np.array(
+    [(dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)]
+)
+
+
+def brute_force_pairs(p_a, diameter):
+    """All pairs (i < j) closer than diameter, from the full N x N distance matrix."""
+    r_array = p_a - p_a[:, np.newaxis]  # vector from one atom to another atom
+    rmag = np.sqrt(np.sum(np.square(r_array), -1))  # distance between all pairs
+    i, j = np.nonzero(np.triu(rmag <= diameter, 1))
+    return i, j
+
+
+def cell_list_pairs(p_a, diameter):
+    """All pairs (i < j) closer than diameter, found with a uniform cell grid.
+
+    The grid cell length equals the collision diameter, so a hitting partner can
+    only sit in the same cell or one of its 26 neighbours. The returned pairs are
+    sorted by (i, j), the same order as brute_force_pairs.
+    """
+    N = len(p_a)
+    if N < 2:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    # integer cell coordinates, shifted so that every coordinate is >= 0
+    cell = np.floor((p_a - p_a.min(axis=0)) / diameter).astype(np.int64)
+    dims = cell.max(axis=0) + 1
+    key = (cell[:, 0] * dims[1] + cell[:, 1]) * dims[2] + cell[:, 2]
+
+    # sort atoms by cell, then every occupied cell is a contiguous block
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+    cell_keys, cell_start, cell_count = np.unique(
+        sorted_key, return_index=True, return_counts=True
+    )
+
+    pairs_i, pairs_j = [], []
+    for offset in OFFSETS:
+        neighbour = cell + offset
+        inside = np.all((neighbour >= 0) & (neighbour < dims), axis=1)
+        atom = np.nonzero(inside)[0]
+        neighbour = neighbour[inside]
+        neighbour_key = (neighbour[:, 0] * dims[1] + neighbour[:, 1]) * dims[
+            2
+        ] + neighbour[:, 2]
+
+        # look up the neighbour cell of every atom among the occupied cells
+        slot = np.searchsorted(cell_keys, neighbour_key)
+        slot[slot == len(cell_keys)] = 0
+        occupied = cell_keys[slot] == neighbour_key
+        atom, slot = atom[occupied], slot[occupied]
+        count = cell_count[slot]
+
+        # expand every (atom, neighbour cell) into (atom, atom in that cell)
+        i = np.repeat(atom, count)
+        first = np.repeat(cell_start[slot] - np.cumsum(count) + count, count)
+        j = order[first + np.arange(len(i))]
+
+        keep = i < j  # each pair once, and never an atom with itself
+        pairs_i.append(i[keep])
+        pairs_j.append(j[keep])
+
+    i, j = np.concatenate(pairs_i), np.concatenate(pairs_j)
+    r_ij = p_a[i] - p_a[j]
+    hit = np.sum(r_ij * r_ij, -1) <= diameter * diameter
+    i, j = i[hit], j[hit]
+
+    sort = np.lexsort((j, i))
+    return i[sort], j[sort]
+
+
+if __name__ == "__main__":
+    p = np.random.rand(500, 3)
+    assert all(
+        np.array_equal(a, b)
+        for a, b in zip(brute_force_pairs(p, 0.05), cell_list_pairs(p, 0.05))
+    )
+    print(len(cell_list_pairs(p, 0.05)[0]), "pairs, cell list matches brute force")
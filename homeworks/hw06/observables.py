@@ -0,0 +1,119 @@
+import csv
+import time
+import numpy as np
+
+GAMMA = 5 / 3  # heat capacity ratio of a monatomic gas
+FIELDS = ("t", "temperature", "pressure", "volume", "PV", "NkT", "PV^gamma")
+
+
+def measure(gas, m, k, elapsed):
+    """Thermodynamic observables of the gas, with the wall momentum over elapsed time."""
+    N = len(gas.v_a)
+    ke = 0.5 * m * np.sum(np.square(gas.v_a))  # total translational ke
+    pressure = gas.delta_p.sum() / (elapsed * gas.walls.area)
+    volume = gas.walls.volume
+    return {
+        "t": gas.t,
+        "temperature": ke / (3 * N * k / 2),
+        "pressure": pressure,
+        "volume": volume,
+        "PV": pressure * volume,
+        "NkT": 2 / 3 * ke,
+        "PV^gamma": pressure * volume**GAMMA,
+    }
+
+
+class Observer:
+    """Measure the gas every `every` runs and send the record to all sinks."""
+
+    def __init__(self, sinks, m, k, every=1000):
+        self.sinks, self.m, self.k, self.every = sinks, m, k, every
+
+    def update(self, gas, runs):
+        if runs % self.every == 0:
+            record = measure(gas, self.m, self.k, self.every * gas.dt)
+            for sink in self.sinks:
+                sink.write(record)
+            gas.delta_p[:] = 0
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class PrintSink:
+    def write(self, record):
+        print("\n".join(f"{name:<12} {record[name]:.6g}" for name in FIELDS[1:]))
+
+    def close(self):
+        pass
+
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(FIELDS)
+
+    def write(self, record):
+        self.writer.writerow([record[name] for name in FIELDS])
+
+    def close(self):
+        self.file.close()
+
+
+class NpyRingSink:
+    """Keep the last `capacity` records in memory and save them to a .npy file.
+
+    The file is written every `capacity` records and on close, one row per
+    record in time order, one column per name in FIELDS.
+    """
+
+    def __init__(self, path, capacity=10000):
+        self.path = path
+        self.buffer = np.zeros((capacity, len(FIELDS)))
+        self.n = 0  # number of records written so far
+
+    def write(self, record):
+        self.buffer[self.n % len(self.buffer)] = [record[name] for name in FIELDS]
+        self.n += 1
+        if self.n % len(self.buffer) == 0:
+            self.save()
+
+    def rows(self):
+        if self.n <= len(self.buffer):
+            return self.buffer[: self.n]
+        return np.roll(self.buffer, -(self.n % len(self.buffer)), axis=0)
+
+    def save(self):
+        np.save(self.path, self.rows())
+
+    def close(self):
+        self.save()
+
+
+class GcurveSink:
+    """Plot some observables against t, at most once every `interval` seconds."""
+
+    def __init__(self, curves, interval=0.5):
+        self.curves = curves  # {name in FIELDS: gcurve}
+        self.interval = interval
+        self.pending = []
+        self.last = -np.inf
+
+    def write(self, record):
+        self.pending.append(record)
+        now = time.perf_counter()
+        if now - self.last >= self.interval:
+            self.flush()
+            self.last = now
+
+    def flush(self):
+        if not self.pending:
+            return
+        for name, curve in self.curves.items():
+            curve.plot([(record["t"], record[name]) for record in self.pending])
+        self.pending = []
+
+    def close(self):
+        self.flush()
@@ -1,19 +1,19 @@
+import os
+import sys
 from numpy import *
 from vpython import *
+from laplace import *
+from electrostatics import capacitance, solve
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vptools.raster import field_arrows, heatmap
 
 epsilon = 8.854E-12
 N = 101
 h = 1E-2/(N-1)
 L, d= 4E-3,1E-3
 V0 = 200
-
-def solve_laplacian(u, u_cond, h, Niter=5000):
-    V = array(u)
-
-    for i in range(Niter):
-        V[u_cond] = u[u_cond]
-        V[1:-1, 1:-1] = 0.25*(V[2:, 1:-1] + V[:-2, 1:-1] + V[1:-1, 2:] + V[1:-1, :-2])
-    return V
+stride = 5  # draw one field arrow every stride grid points
 
 def get_field(V, h):
     Ex, Ey = gradient(V)
@@ -25,43 +25,28 @@ u[int(N/2)-int(L/h/2.0):int(N/2)+int(L/h/2.0), int(N/2) - int(d/h/2.0)] = -V0/2
 u[int(N/2)-int(L/h/2.0):int(N/2)+int(L/h/2.0), int(N/2) + int(d/h/2.0)] = V0/2
 u_cond = not_equal(u, 0)
 
-V = solve_laplacian(u, u_cond, h)
+V = solve(u, u_cond, h)  # sparse LU; or solve_multigrid_cg(u, u_cond, h, tol=1E-8), solve_jacobi(u, u_cond, h)
+print("residual: %.2e" % residual(V, u_cond))
 
 scene = canvas(title='non-ideal capacitor', height=1000, width=1000, center = vec(N*h/2, N*h/2, 0))
 scene.lights = []
 scene.ambient=color.gray(0.99)
 box(pos = vec(N*h/2 , N*h/2 - d/2 - h , 0), length = L, height = h/5, width = h)
 box(pos = vec(N*h/2 , N*h/2 + d/2 - h , 0), length = L, height = h/5, width = h)
-for i in range(N):
-    for j in range(N):
-        point = box(pos=vec(i*h, j*h, 0), length = h, height= h, width = h/10, color=vec((V[i,j]+100)/200,(100-V[i,j])/200,0.0) )
+heatmap(V, vec((N-1)*h/2, (N-1)*h/2, 0), N*h, N*h, "hw07_potential.png", vmin=-V0/2, vmax=V0/2, cmap="redgreen")
 
 Ex, Ey = get_field(V, h)
 
-for i in range(0, N):
-    for j in range(0, N):
-        ar = arrow(pos = vec( i*h, j*h, h/10), axis =vec (Ex[i,j]/2E9, Ey[i,j]/2E9, 0), shaftwidth = h/6.0, color=color.black)
+field_arrows(Ex, Ey, h, stride, scale=stride/2E9, z=h/10, shaftwidth=stride*h/6.0, color=color.black)
 
-#find Q, find C_nonideal = Q/(delta V)
+#find Q, find C_nonideal = Q/(delta V), around the lower plate (and by the field energy),
+#for the plate geometry (1 V across the plates, whatever V0 is)
 #Compare C_nonideal to C_ideal
-Q = 0
-delta = 5
-min_x = int(N / 2) - int(L / h / 2.0) - delta
-max_x = int(N / 2) + int(L / h / 2.0) + delta
-min_y = int(N / 2) - int(d / h / 2.0) - delta
-max_y = int(N / 2) - int(d / h / 2.0) + delta
-
-for i in range(min_x, max_x):
-    Q += (Ey[i, max_y] - Ey[i, min_y]) * h
-
-for i in range(min_y, max_y):
-    Q += (Ex[max_x, i] - Ex[min_x, i]) * h
-
-Q = -Q * epsilon
-C_nonideal = Q / V0
+C_nonideal, C_energy = capacitance(u_cond, h, u < 0, epsilon)
 
 C_ideal = epsilon * L / d
 
 print("Non-ideal: ", C_nonideal)
+print("Non-ideal (energy): ", C_energy)
 print("Ideal: ", C_ideal)
 print("Error Percentage: %.3f" % ((C_ideal - C_nonideal) / C_ideal * -100))
\ No newline at end of file
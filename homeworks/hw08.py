@@ -1,12 +1,16 @@
+import os
+import sys
 from vpython import *
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from vptools.render import BulkRenderer
+
 prob = 0.005
 N, L = 400, 7E-9 / 2.0
 E = 1000000
 q, m, size = 1.6E-19, 1E-6 / 6E23, 0.1E-9  # artificial charge particle
 t, dt, vrms = 0, 1E-16, 10000.0
-atoms, atoms_v = [], []
 
 # initialization
 scene = canvas(width=600, height=600, align='left', background=vector(0.2, 0.2, 0))
@@ -21,10 +25,9 @@ def a_to_v(a):  # array to vector
     return vector(a[0], a[1], a[2])
 
 
-for i in range(N):
-    atom = sphere(canvas=scene, pos=a_to_v(pos_array[i]), radius=size, color=a_to_v(np.random.rand(3, 1)))
-    atoms.append(atom)
-    atoms_v.append(sphere(canvas=scenev, pos=a_to_v(v_array[i]), radius=vrms / 30, color=a_to_v(np.random.rand(3, 1))))
+# all atoms of one canvas are drawn as one object, updated at most 30 times per second
+atoms = BulkRenderer(pos_array, size, color=np.random.rand(N, 3), canvas=scene)
+atoms_v = BulkRenderer(v_array, vrms / 30, color=np.random.rand(N, 3), canvas=scenev)
 
 # the average velocity and two axes in velocity space
 vd_ball = sphere(canvas=scenev, pos=vec(0, 0, 0), radius=vrms / 15, color=color.red)
@@ -61,5 +64,5 @@ while True:
 
     vd_ball.pos = vv / (t / dt)
 
-    for i in range(N):
-        atoms_v[i].pos, atoms[i].pos = a_to_v(v_array[i]), a_to_v(pos_array[i])
\ No newline at end of file
+    atoms_v.update(v_array)
+    atoms.update(pos_array)
\ No newline at end of file
@@ -0,0 +1,283 @@
+import math
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
+from scipy.special import ellipe, ellipk
+
+MU0 = 4 * math.pi * 1e-7  # vacuum permeability (H/m)
+
+
+def loop_bz(radius, rho, z, n_seg=1200, chunk=1 << 20):
+    """B_z (T per A) of a loop of this radius on z = 0 at distance rho from its axis.
+
+    Biot-Savart over n_seg straight pieces, all points at once. B_z of the loop
+    is the same at every angle around the axis, so each point is taken at
+    angle 0. Points are done in blocks of about chunk (point, piece) pairs.
+    """
+    theta = np.linspace(0.0, 2 * math.pi, n_seg, endpoint=False)
+    dtheta = 2 * math.pi / n_seg
+    x_seg, y_seg = radius * np.cos(theta), radius * np.sin(theta)
+    dl_x = -radius * np.sin(theta) * dtheta
+    dl_y = radius * np.cos(theta) * dtheta
+
+    rho, z = np.broadcast_arrays(
+        np.asarray(rho, dtype=float), np.asarray(z, dtype=float)
+    )
+    rho, z = rho.ravel(), z.ravel()
+    bz = np.empty(len(rho))
+    step = max(1, chunk // n_seg)
+    for start in range(0, len(rho), step):
+        p = slice(start, start + step)
+        rx = rho[p, None] - x_seg  # vector r from each piece to the point (y_p = 0)
+        ry = -y_seg
+        r_sq = rx * rx + ry * ry + z[p, None] ** 2
+        cp_z = dl_x * ry - dl_y * rx  # z-component of dl x r
+        bz[p] = np.sum(cp_z / r_sq**1.5, -1)
+    return (MU0 / (4 * math.pi)) * bz
+
+
+@lru_cache(maxsize=None)
+def _gauss_legendre(n_points):  # nodes and weights on [0, 2 pi]
+    x, w = np.polynomial.legendre.leggauss(n_points)
+    return math.pi * (x + 1), math.pi * w
+
+
+class Loop:
+    """A circular loop of this radius, centred at (offset, height).
+
+    Untilted it lies in a plane z = height; tilt turns it about the x axis.
+    """
+
+    def __init__(self, radius, height=0.0, tilt=0.0, offset=(0.0, 0.0)):
+        self.radius, self.height, self.tilt = radius, height, tilt
+        self.offset = tuple(offset)
+
+    def quadrature(self, n_points):
+        """Gauss-Legendre nodes on the loop: (n, 3) positions and (n, 3) weighted dl."""
+        theta, w = _gauss_legendre(n_points)
+        c, s = math.cos(self.tilt), math.sin(self.tilt)
+        u = self.radius * np.cos(theta)
+        v = self.radius * np.sin(theta)
+        pos = np.stack([u, v * c, v * s], -1) + [*self.offset, self.height]
+        dl = np.stack([-v, u * c, u * s], -1) * w[:, None]
+        return pos, dl
+
+
+def neumann(loop_a, loop_b, n_points=64):
+    """Mutual inductance of any two (non-touching) loops by Neumann's formula,
+
+    M = MU0 / (4 pi) * double integral of dl_a . dl_b / |r_a - r_b|,
+    with n_points Gauss-Legendre nodes on each loop. The nodes must be closer
+    together than the loops are, e.g. 64 on R = 5 cm loops 1 cm apart give 5e-5.
+    """
+    r_a, dl_a = loop_a.quadrature(n_points)
+    r_b, dl_b = loop_b.quadrature(n_points)
+    distance = np.linalg.norm(r_a[:, None] - r_b[None], axis=-1)
+    return MU0 / (4 * math.pi) * np.sum((dl_a @ dl_b.T) / distance)
+
+
+def elliptic(radius_a, radius_b, height):
+    """Exact mutual inductance of coaxial loops (Maxwell), for arrays too.
+
+    M = MU0 sqrt(Ra Rb) ((2/k - k) K(k) - 2/k E(k)), k**2 = 4 Ra Rb / ((Ra + Rb)**2 + h**2)
+    """
+    m = 4 * radius_a * radius_b / ((radius_a + radius_b) ** 2 + height**2)
+    k = np.sqrt(m)
+    return (
+        MU0
+        * np.sqrt(radius_a * radius_b)
+        * ((2 / k - k) * ellipk(m) - 2 / k * ellipe(m))
+    )
+
+
+def mutual_inductance(
+    radius_src,
+    radius_dst,
+    height,
+    method="elliptic",
+    n_seg=1200,
+    n_rings=120,
+    n_points=64,
+):
+    """Mutual inductance of two coaxial loops, the dst loop height above the src loop.
+
+    method="brute" is the flux of the Biot-Savart B_z (n_seg pieces, n_rings
+    rings) through the dst loop, the reference; "neumann" is Neumann's formula
+    with n_points nodes per loop; "elliptic" is the exact closed form.
+    """
+    if method == "brute":
+        rho_edges = np.linspace(0.0, radius_dst, n_rings + 1)
+        rho_mid = 0.5 * (rho_edges[:-1] + rho_edges[1:])
+        area_ring = math.pi * np.diff(rho_edges**2)
+        return np.sum(loop_bz(radius_src, rho_mid, height, n_seg) * area_ring)
+    if method == "neumann":
+        return neumann(Loop(radius_src), Loop(radius_dst, height), n_points)
+    if method == "elliptic":
+        return float(elliptic(radius_src, radius_dst, height))
+    raise ValueError(f"unknown method {method!r}")
+
+
+def _coaxial(a, b):
+    return a.tilt == 0 and b.tilt == 0 and a.offset == b.offset
+
+
+def loop_mutual_inductance(a, b, method=None, n_points=64):
+    """Mutual inductance of two Loops. method=None picks "elliptic" for coaxial
+    loops and "neumann" otherwise; "brute" and "elliptic" need coaxial loops.
+    """
+    if method is None:
+        method = "elliptic" if _coaxial(a, b) else "neumann"
+    if method == "neumann":
+        return neumann(a, b, n_points)
+    if not _coaxial(a, b):
+        raise ValueError(f"method {method!r} needs coaxial loops")
+    return mutual_inductance(a.radius, b.radius, b.height - a.height, method)
+
+
+def self_inductance(radius, wire_radius):
+    """Inductance of a loop of round wire, for wire_radius << radius."""
+    return MU0 * radius * (math.log(8 * radius / wire_radius) - 2)
+
+
+_cache = OrderedDict()  # cache key -> M of coaxial loops, least recently used first
+_CACHE_SIZE = 1 << 16
+
+
+def _cache_key(a, b, method):
+    # None for pairs that are not cached (Neumann's formula). The closed form
+    # is symmetric in the radii, so it is filed under them sorted; the
+    # Biot-Savart flux is not exactly reciprocal, so it keeps them in order.
+    if not _coaxial(a, b) or method == "neumann":
+        return None
+    separation = round(float(b.height - a.height), 12)
+    if method == "brute":
+        return ("brute", a.radius, b.radius, separation)
+    return ("elliptic", *sorted((a.radius, b.radius)), abs(separation))
+
+
+def _remember(key, value):
+    _cache[key] = value
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _batch(pairs, method, n_points):  # runs in the worker processes
+    return [loop_mutual_inductance(a, b, method, n_points) for a, b in pairs]
+
+
+def inductance_matrix(
+    loops, wire_radius=1e-3, method=None, processes=None, n_points=64, min_parallel=256
+):
+    """The symmetric N x N inductance matrix of a list of Loops (in H).
+
+    Only the upper triangle is computed. Coaxial pairs that repeat a (radius,
+    radius, separation) seen before, in this call or an earlier one, come from
+    a cache of the last _CACHE_SIZE of them. The rest of the coaxial pairs go
+    through one broadcast call of the closed form; the pairs for Neumann's
+    formula (or "brute") are split over `processes` worker processes
+    (default: all cores) when there are at least min_parallel of them.
+    """
+    n = len(loops)
+    M = np.diag([self_inductance(loop.radius, wire_radius) for loop in loops])
+    shared = {}  # cache key -> the (i, j) that need it
+    single = []  # the (i, j) that are not cached
+    for i, j in zip(*(index.tolist() for index in np.triu_indices(n, 1))):
+        key = _cache_key(loops[i], loops[j], method)
+        if key is None:
+            single.append((i, j))
+        elif key in _cache:
+            _cache.move_to_end(key)
+            M[i, j] = _cache[key]
+        else:
+            shared.setdefault(key, []).append((i, j))
+
+    closed = [key for key in shared if key[0] == "elliptic"]
+    values = {}
+    if closed:
+        first = [(loops[i], loops[j]) for i, j in (shared[key][0] for key in closed)]
+        radius_a, radius_b, height = np.array(
+            [(a.radius, b.radius, b.height - a.height) for a, b in first]
+        ).T
+        values.update(zip(closed, elliptic(radius_a, radius_b, height).tolist()))
+
+    other = [key for key in shared if key[0] != "elliptic"]
+    pairs = [
+        (loops[i], loops[j]) for i, j in [shared[key][0] for key in other] + single
+    ]
+    processes = processes or os.cpu_count()
+    if processes == 1 or len(pairs) < min_parallel:
+        results = _batch(pairs, method, n_points)
+    else:
+        size = -(-len(pairs) // (4 * processes))  # a few batches per process
+        batches = [pairs[k : k + size] for k in range(0, len(pairs), size)]
+        with ProcessPoolExecutor(processes) as pool:
+            results = pool.map(
+                _batch, batches, [method] * len(batches), [n_points] * len(batches)
+            )
+            results = [value for result in results for value in result]
+    values.update(zip(other, results))
+
+    for key, value in values.items():
+        _remember(key, value)
+        for i, j in shared[key]:
+            M[i, j] = value
+    for (i, j), value in zip(single, results[len(other) :]):
+        M[i, j] = value
+    return M + np.triu(M, 1).T
+
+
+if __name__ == "__main__":  # the loops of hw09, both ways round
+    import time
+
+    big, small, h = 0.12, 0.06, 0.10
+    exact = mutual_inductance(big, small, h)
+    for method, tol in ("brute", 1e-4), ("neumann", 1e-12), ("elliptic", 1e-15):
+        M12 = mutual_inductance(big, small, h, method)
+        M21 = mutual_inductance(small, big, -h, method)
+        assert abs(M12 - M21) / exact < tol, method  # reciprocity
+        assert abs(M12 - exact) / exact < tol, method
+        print(f"{method:>9} M12 = {M12 * 1e9:.9f} nH, M21 = {M21 * 1e9:.9f} nH")
+
+    # a loop turned edge-on to the other one links no flux
+    assert abs(neumann(Loop(big), Loop(small, h, tilt=math.pi / 2))) < 1e-12 * exact
+    # swapping loops leaves Neumann's formula unchanged, offset and tilted too
+    a, b = Loop(big, 0.0, 0.3, (0.01, 0.02)), Loop(small, h, -0.2, (0.05, 0.0))
+    assert math.isclose(neumann(a, b), neumann(b, a), rel_tol=1e-12)
+
+    # the mutual inductances of a stack of 300 coaxial loops
+    z = np.arange(300) * 0.01
+    r = 0.05 + 0.01 * np.sin(z)
+    start = time.perf_counter()
+    i, j = np.triu_indices(300, 1)
+    M = elliptic(r[i], r[j], z[j] - z[i])
+    print(
+        f"{len(M)} pairs of a 300-loop stack in {(time.perf_counter() - start) * 1e3:.1f} ms"
+    )
+
+    # a 64-loop coil stack: evenly spaced, so most pairs come from the cache
+    stack = [Loop(0.05, 0.01 * i) for i in range(64)]
+    M = inductance_matrix(stack)
+    M_neumann = inductance_matrix(stack, method="neumann", n_points=128, processes=1)
+    assert np.allclose(M, M_neumann, rtol=1e-7, atol=0)
+    # tilted and offset loops go through Neumann's formula, in parallel
+    tilted = [Loop(0.05, 0.01 * i, 0.05 * i, (0.001 * i, 0.0)) for i in range(64)]
+    results = []
+    for processes in 1, max(2, os.cpu_count()):
+        start = time.perf_counter()
+        results.append(inductance_matrix(tilted, processes=processes, min_parallel=1))
+        elapsed = time.perf_counter() - start
+        print(f"64 tilted loops, {processes} processes: {elapsed:.3f} s")
+    M = results[-1]
+    assert np.array_equal(results[0], M) and np.array_equal(M, M.T)
+    assert np.all(np.linalg.eigvalsh(M) > 0)
+
+    # a 300-loop stack of varying radii: no pair repeats, one broadcast call
+    stack = [Loop(radius, height) for radius, height in zip(r, z)]
+    start = time.perf_counter()
+    M = inductance_matrix(stack)
+    elapsed = time.perf_counter() - start
+    print(f"300-loop stack, inductance_matrix: {elapsed * 1e3:.1f} ms")
+    i, j = np.triu_indices(300, 1)
+    assert np.allclose(M[i, j], elliptic(r[i], r[j], z[j] - z[i]), rtol=1e-12, atol=0)
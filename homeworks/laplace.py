@@ -0,0 +1,243 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+
+def _fixed(u_cond):
+    # Dirichlet nodes: the conductors and the outer edge of the grid (kept at u)
+    fixed = np.array(u_cond, dtype=bool)
+    fixed[0, :] = fixed[-1, :] = fixed[:, 0] = fixed[:, -1] = True
+    return fixed
+
+
+def _sub(start, n):
+    # every second interior index from start (1 or 2), and its two neighbours
+    return slice(start, n - 1, 2), slice(start - 1, n - 2, 2), slice(start + 1, n, 2)
+
+
+def _colors(fixed):
+    """The free nodes of the red and black sub-lattices, as 0/1 weights.
+
+    Each colour is two strided sub-lattices, (odd, odd) + (even, even) for red
+    and (odd, even) + (even, odd) for black, so a sweep needs no masking.
+    """
+    colors = []
+    for parity in ((1, 1), (2, 2)), ((1, 2), (2, 1)):
+        color = []
+        for a, b in parity:
+            sa, sb = _sub(a, fixed.shape[0]), _sub(b, fixed.shape[1])
+            color.append((sa, sb, (~fixed[sa[0], sb[0]]).astype(float)))
+        colors.append(color)
+    return colors
+
+
+def _laplacian(V):  # 5-point Laplacian times h**2 on the interior
+    return V[2:, 1:-1] + V[:-2, 1:-1] + V[1:-1, 2:] + V[1:-1, :-2] - 4 * V[1:-1, 1:-1]
+
+
+def _sweep(V, f, colors, omega=1.0):
+    # one red-black Gauss-Seidel (omega = 1) or SOR sweep for laplacian(V) = f
+    for color in colors:
+        for (i, up, down), (j, left, right), free in color:
+            lap = V[up, j] + V[down, j] + V[i, left] + V[i, right] - 4 * V[i, j]
+            V[i, j] += (0.25 * omega) * free * (lap - f[i, j])
+
+
+def residual(V, u_cond):
+    """Largest change one Jacobi sweep would still make, relative to the largest |V|."""
+    fixed = _fixed(u_cond)
+    r = np.where(fixed[1:-1, 1:-1], 0.0, 0.25 * _laplacian(V))
+    return np.max(np.abs(r)) / max(np.max(np.abs(V)), 1e-300)
+
+
+def solve_jacobi(u, u_cond, h, Niter=5000):
+    """The original fixed-count Jacobi iteration of hw07."""
+    V = np.array(u)
+    for i in range(Niter):
+        V[u_cond] = u[u_cond]
+        V[1:-1, 1:-1] = 0.25 * (V[2:, 1:-1] + V[:-2, 1:-1] + V[1:-1, 2:] + V[1:-1, :-2])
+    return V
+
+
+def solve_sor(u, u_cond, h, omega=None, tol=1e-8, max_iter=100000, check_every=10):
+    """Red-black SOR until residual(V) < tol. u holds the values of the fixed nodes.
+
+    The default omega = 2 / (1 + sin(pi / n)) is optimal for a square n x n grid.
+    """
+    V = np.array(u, dtype=float)
+    colors = _colors(_fixed(u_cond))
+    f = np.zeros_like(V)
+    if omega is None:
+        omega = 2 / (1 + np.sin(np.pi / (max(V.shape) - 1)))
+    for iteration in range(1, max_iter + 1):
+        _sweep(V, f, colors, omega)
+        if iteration % check_every == 0 and residual(V, u_cond) < tol:
+            break
+    return V
+
+
+def _restrict(r):
+    # full weighting of the fine residual onto every second node
+    c = np.zeros(((r.shape[0] + 1) // 2, (r.shape[1] + 1) // 2))
+    c[1:-1, 1:-1] = (
+        4 * r[2:-2:2, 2:-2:2]
+        + 2
+        * (
+            r[1:-3:2, 2:-2:2]
+            + r[3:-1:2, 2:-2:2]
+            + r[2:-2:2, 1:-3:2]
+            + r[2:-2:2, 3:-1:2]
+        )
+        + (
+            r[1:-3:2, 1:-3:2]
+            + r[3:-1:2, 1:-3:2]
+            + r[1:-3:2, 3:-1:2]
+            + r[3:-1:2, 3:-1:2]
+        )
+    ) / 16
+    return c
+
+
+def _prolong(e, shape):
+    # bilinear interpolation of the coarse correction back to the fine grid
+    f = np.zeros(shape)
+    f[::2, ::2] = e
+    f[1::2, ::2] = 0.5 * (e[:-1] + e[1:])
+    f[::2, 1::2] = 0.5 * (e[:, :-1] + e[:, 1:])
+    f[1::2, 1::2] = 0.25 * (e[:-1, :-1] + e[1:, :-1] + e[:-1, 1:] + e[1:, 1:])
+    return f
+
+
+def _coarsen(fixed):
+    # a coarse node is fixed if any fine node around it is, so that no
+    # coarse correction leaks through a thin conductor
+    grown = fixed.copy()
+    grown[1:] |= fixed[:-1]
+    grown[:-1] |= fixed[1:]
+    grown2 = grown.copy()
+    grown2[:, 1:] |= grown[:, :-1]
+    grown2[:, :-1] |= grown[:, 1:]
+    return grown2[::2, ::2]
+
+
+def _levels(fixed, coarsest=5):
+    # masks from the finest grid down, while both sides have an even number of cells
+    levels = [fixed]
+    while all((n - 1) % 2 == 0 and n - 1 >= 2 * coarsest for n in levels[-1].shape):
+        levels.append(_coarsen(levels[-1]))
+    return [(mask, _colors(mask)) for mask in levels[:-1]] + [
+        (levels[-1], _coarse_solver(levels[-1]))
+    ]
+
+
+def _second_difference(n):  # 1D part of the 5-point Laplacian, times h**2
+    return sp.diags([np.ones(n - 1), -2 * np.ones(n), np.ones(n - 1)], [-1, 0, 1])
+
+
+def _coarse_solver(fixed):
+    # sparse LU of the 5-point Laplacian on the free nodes of the coarsest grid
+    n, m = fixed.shape
+    free = ~fixed.ravel()
+    laplacian = sp.kronsum(_second_difference(m), _second_difference(n)).tocsr()
+    return free, splu(laplacian[free][:, free].tocsc())
+
+
+def _v_cycle(V, f, levels, pre=2, post=2):
+    # symmetric V-cycle for laplacian(V) = f (post-smoothing in reverse colour
+    # order, an exact solve on the coarsest grid), so it can precondition CG
+    if len(levels) == 1:  # coarsest grid: solved exactly
+        free, lu = levels[0][1]
+        V.ravel()[free] = lu.solve(f.ravel()[free])
+        return
+    fixed, colors = levels[0]
+    for _ in range(pre):
+        _sweep(V, f, colors)
+    r = np.zeros_like(V)
+    r[1:-1, 1:-1] = f[1:-1, 1:-1] - _laplacian(V)
+    r[fixed] = 0
+    f_coarse = 4 * _restrict(r)  # the coarse grid spacing is 2h
+    e = np.zeros_like(f_coarse)
+    _v_cycle(e, f_coarse, levels[1:], pre, post)
+    correction = _prolong(e, V.shape)
+    correction[fixed] = 0
+    V += correction
+    for _ in range(post):
+        _sweep(V, f, colors[::-1])
+
+
+def _minus_laplacian(V, fixed):  # the operator solved for, zero on fixed nodes
+    A = np.zeros_like(V)
+    A[1:-1, 1:-1] = -_laplacian(V)
+    A[fixed] = 0
+    return A
+
+
+def solve_multigrid(u, u_cond, h, tol=1e-8, max_cycles=200):
+    """Plain multigrid V-cycles until residual(V) < tol.
+
+    The grid is coarsened while it has an even number of cells per side, so
+    grids of 2**k * m + 1 points (e.g. 101 or 1001) go down several levels.
+    Coarse grids fix every node next to a conductor, which keeps thin plates
+    but makes each cycle cut the error by only about half; solve_multigrid_cg
+    converges much faster.
+    """
+    V = np.array(u, dtype=float)
+    levels = _levels(_fixed(u_cond))
+    f = np.zeros_like(V)
+    for cycle in range(max_cycles):
+        _v_cycle(V, f, levels)
+        if residual(V, u_cond) < tol:
+            break
+    return V
+
+
+def solve_multigrid_cg(u, u_cond, h, tol=1e-8, max_cycles=100):
+    """Conjugate gradients preconditioned by one V-cycle, until residual(V) < tol.
+
+    The V-cycle is that of solve_multigrid, which is symmetric (as conjugate
+    gradients need); about 10 cycles reach 1e-10.
+    """
+    V = np.array(u, dtype=float)
+    fixed = _fixed(u_cond)
+    levels = _levels(fixed)
+    scale = max(np.max(np.abs(V)), 1e-300)
+
+    def precondition(r):
+        e = np.zeros_like(r)
+        _v_cycle(e, -r, levels)
+        return e
+
+    r = -_minus_laplacian(V, fixed)
+    z = precondition(r)
+    p, rz = z, np.vdot(r, z)
+    for cycle in range(max_cycles):
+        if 0.25 * np.max(np.abs(r)) / scale < tol:  # same measure as residual()
+            break
+        q = _minus_laplacian(p, fixed)
+        alpha = rz / np.vdot(p, q)
+        V += alpha * p
+        r -= alpha * q
+        z = precondition(r)
+        rz, rz_old = np.vdot(r, z), rz
+        p = z + (rz / rz_old) * p
+    return V
+
+
+if __name__ == "__main__":  # the parallel-plate capacitor of hw07
+    N, V0 = 101, 200
+    u = np.zeros([N, N])
+    u[30:70, 45] = -V0 / 2
+    u[30:70, 55] = V0 / 2
+    u_cond = u != 0
+    V_sor = solve_sor(u, u_cond, 1e-4, tol=1e-10)
+    V_mg = solve_multigrid_cg(u, u_cond, 1e-4, tol=1e-10)
+    assert residual(V_mg, u_cond) < 1e-10 and np.max(np.abs(V_mg - V_sor)) < 1e-6
+    V_vcycles = solve_multigrid(u, u_cond, 1e-4, tol=1e-10)
+    assert residual(V_vcycles, u_cond) < 1e-10
+    assert np.max(np.abs(V_vcycles - V_sor)) < 1e-6
+    print(
+        "residual",
+        residual(V_mg, u_cond),
+        "jacobi(5000)",
+        residual(solve_jacobi(u, u_cond, 1e-4), u_cond),
+    )
@@ -0,0 +1,326 @@
+import numpy as np
+
+
+def simulate_mode(mode_index, N, m, k, d, A=0.10, time_step=0.0003, waves=10):
+    """ω of one mode, measured in the time domain as in hw04.
+
+    The chain of N masses m, springs k of length d (periodic), starts in the
+    standing wave A sin(wave_vector x) and is stepped until ball 0 has made
+    `waves` waves. Returns (wave_vector, ω).
+    """
+    wave_unit = 2 * np.pi / (N * d)
+    wave_vector = mode_index * wave_unit
+    initial_phase = wave_vector * np.arange(N) * d
+
+    ball_pos = np.arange(N) * d + A * np.sin(initial_phase)
+    velocities = np.zeros(N)
+    spring_len = np.ones(N) * d
+
+    wave_count = 0
+    time = 0
+    while wave_count < waves:
+        time += time_step
+        spring_len[:-1] = ball_pos[1:] - ball_pos[:-1]
+        velocities[1:] += (spring_len[1:] - spring_len[:-1]) * k / m * time_step
+
+        # periodic boundary: the last spring joins ball N-1 to ball 0
+        spring_len[-1] = ball_pos[0] - ball_pos[-1] + N * d
+        velocities[0] += (spring_len[0] - spring_len[-1]) * k / m * time_step
+
+        # a half wave each time ball 0 crosses 0
+        if (
+            ball_pos[0] * (ball_pos[0] + velocities[0] * time_step) < 0
+            and time > 5 * time_step
+        ):
+            wave_count += 0.5
+
+        ball_pos += velocities * time_step
+
+    average_period = time / wave_count
+    return wave_vector, 2.0 * np.pi / average_period
+
+
+def _kick(ball_pos, velocities, spring_len, N, m, k, d, time_step):
+    # the spring forces of simulate_mode, on every row of (modes, N) arrays
+    spring_len[:, :-1] = ball_pos[:, 1:] - ball_pos[:, :-1]
+    velocities[:, 1:] += (spring_len[:, 1:] - spring_len[:, :-1]) * k / m * time_step
+
+    spring_len[:, -1] = ball_pos[:, 0] - ball_pos[:, -1] + N * d
+    velocities[:, 0] += (spring_len[:, 0] - spring_len[:, -1]) * k / m * time_step
+
+
+def simulate_modes(mode_indices, N, m, k, d, A=0.10, time_step=0.0003, waves=10):
+    """simulate_mode for many modes at once, one row of a (modes, N) array each.
+
+    Every row takes exactly the steps simulate_mode would, with its own wave
+    counter; a row leaves the arrays once it has made `waves` waves, so the
+    results are bit for bit those of simulate_mode. Returns (wave_vectors, ω).
+    """
+    wave_unit = 2 * np.pi / (N * d)
+    wave_vectors = np.asarray(mode_indices, dtype=float) * wave_unit
+    initial_phase = wave_vectors[:, None] * np.arange(N) * d
+
+    ball_pos = np.arange(N) * d + A * np.sin(initial_phase)
+    velocities = np.zeros_like(ball_pos)
+    spring_len = np.ones_like(ball_pos) * d
+
+    rows = np.arange(len(wave_vectors))  # the mode of each row still running
+    wave_count = np.zeros(len(rows))
+    omegas = np.zeros(len(rows))
+    time = 0
+    while len(rows):
+        finished = wave_count >= waves
+        if finished.any():  # record the finished modes and drop their rows
+            omegas[rows[finished]] = 2.0 * np.pi / (time / wave_count[finished])
+            keep = ~finished
+            rows, wave_count = rows[keep], wave_count[keep]
+            ball_pos, velocities = ball_pos[keep], velocities[keep]
+            spring_len = spring_len[keep]
+            if not len(rows):
+                break
+
+        time += time_step
+        _kick(ball_pos, velocities, spring_len, N, m, k, d, time_step)
+        if time > 5 * time_step:
+            crossing = (
+                ball_pos[:, 0] * (ball_pos[:, 0] + velocities[:, 0] * time_step) < 0
+            )
+            wave_count += 0.5 * crossing
+
+        ball_pos += velocities * time_step
+
+    return wave_vectors, omegas
+
+
+class PeriodEstimator:
+    """ω of standing waves, from the zero crossings of every particle.
+
+    Give it the displacements u, a (rows, N) array, after every step. Each
+    crossing time is interpolated between steps, linearly or by the cubic
+    through four steps. Then, per row, t = c_p + j T/2 for the jth crossing of
+    particle p is fitted by least squares to all crossings, weighted by the
+    particle's amplitude squared: particles near a node cross at random and
+    hardly count, and those below `floor` times the largest are ignored.
+    The confidence interval comes from the scatter between crossings; an error
+    shared by all of them (the interpolation, in a pure mode) is not in it.
+    """
+
+    def __init__(self, u, time_step, interpolation="linear", floor=1e-3):
+        self.time_step, self.interpolation, self.floor = time_step, interpolation, floor
+        self.history = [np.array(u, dtype=float)]  # the last displacements
+        self.amplitude = np.abs(self.history[0])
+        self.count = np.zeros(np.shape(u), dtype=int)  # crossings of each particle
+        self.crossings = [[] for _ in range(len(u))]  # per row: (particle, j, t) blocks
+
+    def select(self, keep):
+        """Keep only the rows where keep is True (rows that stopped are dropped)."""
+        self.history = [u[keep] for u in self.history]
+        self.amplitude, self.count = self.amplitude[keep], self.count[keep]
+        self.crossings = [c for c, kept in zip(self.crossings, keep) if kept]
+
+    def update(self, t, u):
+        """Record the crossings up to time t; returns the rows that had any."""
+        self.history = self.history[-3:] + [np.array(u, dtype=float)]
+        self.amplitude = np.maximum(self.amplitude, np.abs(u))
+        if self.interpolation == "linear":
+            a, b, t_b = self.history[-2], self.history[-1], t
+        elif len(self.history) < 4:
+            return np.zeros(0, dtype=int)
+        else:  # crossings between the two middle steps of the four
+            a, b, t_b = self.history[-3], self.history[-2], t - self.time_step
+        large = self.amplitude > self.floor * self.amplitude.max(-1, keepdims=True)
+        r, p = np.nonzero((a * b < 0) & large)
+        if not len(r):
+            return r
+
+        s = a[r, p] / (a[r, p] - b[r, p])  # fraction of the step, linearly
+        if self.interpolation == "cubic":
+            y = [u[r, p] for u in self.history]  # at s = -1, 0, 1, 2
+            for _ in range(3):  # Newton steps on the Lagrange cubic
+                value = (
+                    -y[0] * (s**3 - 3 * s**2 + 2 * s) / 6
+                    + y[1] * (s**3 - 2 * s**2 - s + 2) / 2
+                    - y[2] * (s**3 - s**2 - 2 * s) / 2
+                    + y[3] * (s**3 - s) / 6
+                )
+                slope = (
+                    -y[0] * (3 * s**2 - 6 * s + 2) / 6
+                    + y[1] * (3 * s**2 - 4 * s - 1) / 2
+                    - y[2] * (3 * s**2 - 2 * s - 2) / 2
+                    + y[3] * (3 * s**2 - 1) / 6
+                )
+                s = np.clip(s - value / slope, 0, 1)
+        t_cross = t_b - (1 - s) * self.time_step
+        j = self.count[r, p]
+        self.count[r, p] += 1
+        rows = np.unique(r)
+        for row in rows:
+            mine = r == row
+            self.crossings[row].append(np.stack([p[mine], j[mine], t_cross[mine]]))
+        return rows
+
+    def estimate(self, row, confidence=1.96):
+        """(ω, half width of its confidence interval) of one row; (nan, inf) until
+        there are enough crossings to tell.
+        """
+        if not self.crossings[row]:
+            return np.nan, np.inf
+        p, j, t = np.concatenate(self.crossings[row], axis=1)
+        p = p.astype(int)
+        n = np.bincount(p)
+        used = n > 0
+        j = j - (np.bincount(p, j)[used] / n[used])[np.cumsum(used)[p] - 1]
+        t = t - (np.bincount(p, t)[used] / n[used])[np.cumsum(used)[p] - 1]
+        w = self.amplitude[row, p] ** 2
+        Sjj = np.sum(w * j * j)
+        dof = len(t) - np.count_nonzero(used) - 1
+        if Sjj == 0 or dof < 1:
+            return np.nan, np.inf
+        half_period = np.sum(w * j * t) / Sjj
+        residual = t - half_period * j
+        error = confidence * np.sqrt(np.sum(w * residual**2) / dof / Sjj)
+        return np.pi / half_period, np.pi * error / half_period**2
+
+
+def measure_modes(
+    mode_indices,
+    N,
+    m,
+    k,
+    d,
+    A=0.10,
+    time_step=0.0003,
+    rtol=1e-5,
+    max_waves=10,
+    interpolation="linear",
+):
+    """Like simulate_modes, but each mode stops as soon as its ω is known to rtol.
+
+    The chains are stepped like simulate_mode, all modes at once, except that
+    every spring is stretched from the current positions (simulate_mode kicks
+    the last ball with the closing spring of the step before, which spoils the
+    mode near the seam by about 1e-3). A PeriodEstimator follows every
+    particle. A mode stops when it has made a full wave and the confidence
+    half width of ω is below rtol ω (or after max_waves waves). Returns
+    (wave_vectors, ω, half widths, time simulated).
+    """
+    wave_unit = 2 * np.pi / (N * d)
+    wave_vectors = np.asarray(mode_indices, dtype=float) * wave_unit
+    initial_phase = wave_vectors[:, None] * np.arange(N) * d
+
+    ball_orig = np.arange(N) * d
+    ball_pos = ball_orig + A * np.sin(initial_phase)
+    velocities = np.zeros_like(ball_pos)
+    estimator = PeriodEstimator(ball_pos - ball_orig, time_step, interpolation)
+
+    rows = np.arange(len(wave_vectors))
+    omegas, errors, times = (np.full(len(rows), np.nan) for _ in range(3))
+    time = 0
+    while len(rows):
+        time += time_step
+        spring_len = np.roll(ball_pos, -1, axis=1) - ball_pos
+        spring_len[:, -1] += N * d
+        velocities += (spring_len - np.roll(spring_len, 1, axis=1)) * k / m * time_step
+        ball_pos += velocities * time_step
+
+        finished = np.zeros(len(rows), dtype=bool)
+        for row in estimator.update(time, ball_pos - ball_orig):
+            if estimator.count[row].max() < 3:  # not yet a full wave
+                continue
+            omega, error = estimator.estimate(row)
+            if error < rtol * omega or estimator.count[row].max() > 2 * max_waves:
+                omegas[rows[row]], errors[rows[row]] = omega, error
+                times[rows[row]] = time
+                finished[row] = True
+        if finished.any():
+            keep = ~finished
+            rows, ball_pos = rows[keep], ball_pos[keep]
+            velocities = velocities[keep]
+            estimator.select(keep)
+
+    return wave_vectors, omegas, errors, times
+
+
+def dispersion(wave_vector, m, k, d):
+    """ω = 2 sqrt(k/m) |sin(q d / 2)| of the periodic chain."""
+    return 2 * np.sqrt(k / m) * np.abs(np.sin(np.asarray(wave_vector) * d / 2))
+
+
+def stiffness_matrix(N, k):
+    """The periodic N x N stiffness matrix: m x'' = -K x."""
+    K = 2 * k * np.eye(N)
+    K -= k * np.roll(np.eye(N), 1, axis=1)
+    K -= k * np.roll(np.eye(N), -1, axis=1)
+    return K
+
+
+def normal_modes(N, m, k, d, method="fft"):
+    """All N normal modes: wave vectors q in [0, π/d] and their ω, sorted by q.
+
+    K is circulant, so method="fft" gets its eigenvalues as the FFT of its
+    first column (O(N log N)); method="eigh" diagonalizes the dense K (O(N**3),
+    for checking) and reads each mode's |q| off the FFT of its eigenvector.
+    """
+    if method == "fft":
+        column = np.zeros(N)
+        column[0], column[1], column[-1] = 2 * k, -k, -k
+        eigenvalues = np.fft.fft(column).real
+        q = np.abs(2 * np.pi * np.fft.fftfreq(N, d))
+    elif method == "eigh":
+        eigenvalues, vectors = np.linalg.eigh(stiffness_matrix(N, k))
+        harmonic = np.argmax(np.abs(np.fft.rfft(vectors, axis=0)), axis=0)
+        q = 2 * np.pi * harmonic / (N * d)
+    else:
+        raise ValueError(f"unknown method {method!r}")
+    omega = np.sqrt(np.maximum(eigenvalues, 0) / m)
+    order = np.argsort(q, kind="stable")
+    return q[order], omega[order]
+
+
+if __name__ == "__main__":  # the chain of hw04
+    import time
+
+    N, m, k, d = 50, 0.1, 10.0, 0.4
+    q, omega = normal_modes(N, m, k, d)
+    assert np.allclose(omega, dispersion(q, m, k, d))
+    q_eigh, omega_eigh = normal_modes(N, m, k, d, "eigh")
+    assert np.allclose(q_eigh, q) and np.allclose(omega_eigh, omega)
+
+    wave_vector, omega_sim = simulate_mode(3, N, m, k, d)
+    exact = dispersion(wave_vector, m, k, d)
+    print(f"mode 3: time domain ω = {omega_sim:.4f}, normal modes ω = {exact:.4f}")
+
+    indices = np.arange(1, N / 2 - 1, 1.0)
+    start = time.perf_counter()
+    serial = [simulate_mode(i, N, m, k, d) for i in indices]
+    elapsed_serial = time.perf_counter() - start
+    start = time.perf_counter()
+    wave_vectors, omegas = simulate_modes(indices, N, m, k, d)
+    elapsed = time.perf_counter() - start
+    assert [tuple(pair) for pair in serial] == list(zip(wave_vectors, omegas))
+    print(
+        f"{len(indices)} modes: {elapsed_serial:.2f} s one by one, {elapsed:.2f} s batched"
+    )
+
+    # crossings of all particles, against 10 waves of ball 0. Symplectic Euler
+    # turns a mode by 2 arcsin(ω dt / 2) per step, so that is what is measured
+    exact = dispersion(wave_vectors, m, k, d)
+    stepped = 2 / 0.0003 * np.arcsin(exact * 0.0003 / 2)
+    for interpolation, tol in ("linear", 1e-8), ("cubic", 1e-11):
+        start = time.perf_counter()
+        _, omega_fit, error, t_fit = measure_modes(
+            indices, N, m, k, d, interpolation=interpolation
+        )
+        elapsed = time.perf_counter() - start
+        worst = np.max(np.abs(omega_fit / stepped - 1))
+        print(
+            f"{interpolation:>6}: worst error {worst:.1e} (10 waves of ball 0:"
+            f" {np.max(np.abs(omegas / exact - 1)):.1e}) in {elapsed:.2f} s,"
+            f" {np.sum(t_fit) / np.sum(20 * np.pi / exact):.3f} of the simulated time"
+        )
+        assert worst < tol and np.all(error < 1e-4 * omega_fit)
+
+    start = time.perf_counter()
+    q, omega = normal_modes(10**4, m, k, d)
+    print(f"N = 10^4: {len(q)} modes in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    assert np.allclose(omega, dispersion(q, m, k, d))
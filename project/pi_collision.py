@@ -0,0 +1,129 @@
+from math import atan, ceil, inf, pi, sqrt
+
+# the scene, shared with final.py: half the length of the track, the block
+# sizes and the right face of the wall (a 0.2 thick box centred at -L)
+L = 30
+size_big, size_small = 5, 2
+wall_face = -L + 0.1
+
+
+def count_collisions(mass_big, mass_small=1):
+    """Exact number of collisions (block and wall) for a small block at rest.
+
+    In the coordinates (sqrt(M) v_big, sqrt(m) v_small) every block collision
+    followed by a wall collision rotates the velocity by 2 * theta, with
+    theta = atan(sqrt(m / M)), so the n-th collision happens only if n * theta < pi.
+    """
+    theta = atan(sqrt(mass_small / mass_big))
+    return ceil(pi / theta - 1e-9) - 1
+
+
+def simulate(
+    mass_big,
+    mass_small=1,
+    v_big=-10,
+    v_small=0,
+    x_big=0,
+    x_small=-L / 2,
+    record=True,
+):
+    """Event-driven run: jump from one collision to the next analytically.
+
+    Returns the collision count and the event timeline, a list of
+    (t, kind, x_big, x_small, v_big, v_small) right after every collision,
+    where kind is "wall" or "block". The first entry is the initial state.
+    """
+    t, collision_count = 0.0, 0
+    events = [(t, "start", x_big, x_small, v_big, v_small)] if record else None
+
+    while True:
+        # time until the small block reaches the wall
+        if v_small < 0:
+            t_wall = max((x_small - size_small / 2 - wall_face) / -v_small, 0.0)
+        else:
+            t_wall = inf
+
+        # time until the small block reaches the big block
+        gap = (x_big - size_big / 2) - (x_small + size_small / 2)
+        if v_small > v_big:
+            t_block = max(gap / (v_small - v_big), 0.0)
+        else:
+            t_block = inf
+
+        if t_wall == inf and t_block == inf:  # both blocks move away forever
+            break
+
+        dt = min(t_wall, t_block)
+        t += dt
+        x_big += v_big * dt
+        x_small += v_small * dt
+        if t_wall <= t_block:
+            kind = "wall"
+            v_small = -v_small
+        else:
+            kind = "block"
+            # elastic collision, written to keep precision for large mass_big
+            dv = v_small - v_big
+            v_big, v_small = (
+                v_big + 2 * mass_small / (mass_big + mass_small) * dv,
+                v_small - 2 * mass_big / (mass_big + mass_small) * dv,
+            )
+        collision_count += 1
+        if record:
+            events.append((t, kind, x_big, x_small, v_big, v_small))
+
+    return collision_count, events
+
+
+def state_at(events, t):
+    """Positions and velocities (x_big, x_small, v_big, v_small) at time t."""
+    lo, hi = 0, len(events) - 1
+    while lo < hi:  # last event at or before t
+        mid = (lo + hi + 1) // 2
+        if events[mid][0] <= t:
+            lo = mid
+        else:
+            hi = mid - 1
+    t0, _, x_big, x_small, v_big, v_small = events[lo]
+    return (
+        x_big + v_big * (t - t0),
+        x_small + v_small * (t - t0),
+        v_big,
+        v_small,
+    )
+
+
+def replay(events, big_block, small_block, duration=None, fps=100, on_frame=None):
+    """Show an event timeline with the big_block / small_block boxes.
+
+    Runs until the big block passes L / 2 moving away (as in final.py), or for
+    `duration` seconds of simulated time. on_frame(collisions, v_big, v_small)
+    is called every frame, e.g. to update an info panel.
+    """
+    from vpython import rate
+
+    t_last, _, x_big, _, v_big, _ = events[-1]
+    if duration is None:
+        t_leave = (L / 2 - size_big - x_big) / v_big if v_big > 0 else 1.0
+        duration = t_last + max(t_leave, 0.0)
+
+    collisions = 0
+    frames = max(int(duration * fps), 1)
+    for frame in range(frames + 1):
+        rate(fps)
+        t = duration * frame / frames
+        x_big, x_small, v_big, v_small = state_at(events, t)
+        big_block.pos.x = x_big
+        small_block.pos.x = x_small
+        while collisions + 1 < len(events) and events[collisions + 1][0] <= t:
+            collisions += 1
+        if on_frame is not None:
+            on_frame(collisions, v_big, v_small)
+
+
+if __name__ == "__main__":
+    for i in range(6):
+        n, _ = simulate(100**i, record=False)
+        assert n == count_collisions(100**i), (i, n)
+    for i in range(11):
+        print(f"Mass Ratio: 1 : 100^{i}  Collisions = {count_collisions(100 ** i)}")
@@ -0,0 +1,6 @@
+# Helpers shared by the homework, example and project scripts.
+#
+# Modules import each other as vptools.<module>, so their self-checks and
+# benchmarks run from the repository root as modules, e.g.
+#     python -m vptools.gravity
+#     python -m vptools.benchmark_integrators
@@ -0,0 +1,163 @@
+import time
+import numpy as np
+from vptools.integrators import *
+
+# Run from the repository root: python -m vptools.benchmark_integrators
+# The scenes that step by hand, as NumPy states (x, v), an acceleration a(x) and
+# the total energy E(x, v), with the step and duration of the script.
+# Drag and hw02's collisions are left out: the energy has to be conserved.
+
+g = np.array([0.0, -9.8, 0.0])
+
+
+def spring_scene(m, L, k, x0, v0, gravity=True):  # a ball hanging from the origin
+    def acceleration(x):
+        r = np.linalg.norm(x, axis=-1, keepdims=True)
+        return -k / m * (r - L) * x / r + (g if gravity else 0)
+
+    def energy(x, v):
+        r = np.linalg.norm(x, axis=-1)
+        potential = 0.5 * k * (r - L) ** 2 - (m * x @ g if gravity else 0)
+        return np.sum(0.5 * m * np.sum(v * v, -1) + potential)
+
+    return acceleration, energy, (np.array(x0, dtype=float), np.array(v0, dtype=float))
+
+
+def sun_scene(GM, masses, x0, v0, mutual=True):  # bodies around a fixed sun at 0
+    masses = np.asarray(masses, dtype=float)[:, None]
+    G = GM[1]
+
+    def acceleration(x):
+        a = -GM[0] * x / np.linalg.norm(x, axis=-1, keepdims=True) ** 3
+        if mutual:
+            r = x[None] - x[:, None]  # r[i, j] from i to j
+            d = np.linalg.norm(r, axis=-1, keepdims=True)
+            np.fill_diagonal(d[..., 0], np.inf)
+            a += G * np.sum(masses[None] * r / d**3, 1)
+        return a
+
+    def energy(x, v):
+        E = np.sum(
+            masses[:, 0]
+            * (0.5 * np.sum(v * v, -1) - GM[0] / np.linalg.norm(x, axis=-1))
+        )
+        if mutual:
+            i, j = np.triu_indices(len(x), 1)
+            E -= G * np.sum(
+                masses[i, 0] * masses[j, 0] / np.linalg.norm(x[i] - x[j], axis=-1)
+            )
+        return E
+
+    return acceleration, energy, (np.array(x0, dtype=float), np.array(v0, dtype=float))
+
+
+def chain_scene(n=50, length=100, k=100, m=0.1):  # project/line.py, undamped
+    rest = length / (n - 1)
+    x0 = np.zeros((n, 3))
+    x0[:, 0] = np.arange(n) * rest - length / 2
+    x0[:, 1] = 20
+    x0[n // 2, 1] += 3
+
+    def acceleration(x):
+        r = x[1:] - x[:-1]
+        d = np.linalg.norm(r, axis=-1, keepdims=True)
+        f = -k * (d - rest) * r / d  # on the upper end of each spring
+        a = np.tile(g, (n, 1))
+        a[1:] += f / m
+        a[:-1] -= f / m
+        a[[0, -1]] = 0  # the ends are fixed
+        return a
+
+    def energy(x, v):
+        d = np.linalg.norm(x[1:] - x[:-1], axis=-1)
+        return (
+            np.sum(0.5 * m * v * v)
+            - m * np.sum(x @ g)
+            + 0.5 * k * np.sum((d - rest) ** 2)
+        )
+
+    return acceleration, energy, (x0, np.zeros_like(x0))
+
+
+def hw03():
+    G, sun, earth, moon = 6.6743e-11, 1.99e30, 5.97e24, 7.36e22
+    theta = 5.145 * np.pi / 180.0
+    direction = np.array([np.cos(theta), -np.sin(theta), 0])
+    earth_x = -3.84e8 * moon / (earth + moon) * direction + [1.495e11, 0, 0]
+    moon_x = 3.84e8 * earth / (earth + moon) * direction + [1.495e11, 0, 0]
+    earth_v = [0, 0, 1.022e3 * moon / earth - 2.9783e4]
+    moon_v = [0, 0, -1.022e3 - 2.9783e4]
+    return sun_scene((G * sun, G), [earth, moon], [earth_x, moon_x], [earth_v, moon_v])
+
+
+def keplers_law():
+    G, sun = 6.673e-11, 1.989e30
+    x0 = [[1.495e11, 0, 0], [2.279e11, 0, 0], [8.7665e10, 0, 0]]
+    v0 = [[0, 0, -2.9783e4], [0, 0, -2.4077e4], [0, 0, -54563.3]]
+    return sun_scene((G * sun, G), [5.972e24, 6.4169e23, 2.2e14], x0, v0, mutual=False)
+
+
+year = 365.25 * 86400
+scenes = {  # name: (acceleration, energy, state), dt of the script, duration
+    "VP02/pendulum": (
+        spring_scene(0.5, 0.5, 15000, [0, -0.5 - 0.5 * 9.8 / 15000, 0], [0.6, 0, 0]),
+        1e-3,
+        5,
+    ),
+    "VP02/shm": (spring_scene(0.2, 0.5, 15, [0, -0.5, 0], [0, 0, 0]), 1e-3, 10),
+    "VP04/damped": (
+        spring_scene(0.2, 0.2, 20, [0.23, 0, 0], [0, 0, 0], False),
+        1e-3,
+        10,
+    ),
+    "hw02": (  # each ball relative to its own anchor: they don't interact here
+        spring_scene(
+            1,
+            2,
+            150000,
+            [[-np.sqrt(2**2 - 1.95**2), -1.95, 0]] * 2 + [[0, -2, 0]] * 3,
+            np.zeros((5, 3)),
+        ),
+        1e-4,
+        1,
+    ),
+    "hw03": (hw03(), 8 * 3600, year),
+    "VP03/keplers_law": (keplers_law(), 6 * 3600, year),
+    "project/line": (chain_scene(), 5e-3, 10),
+}
+
+
+def drift(integrator, energy, state, dt, duration, samples=200):
+    """Largest |E - E0| / |E0| along the run, and the wall time it took."""
+    E0 = energy(*state)
+    n_steps = round(duration / dt)
+    every = max(n_steps // samples, 1)
+    worst = 0.0
+    start = time.perf_counter()
+    with np.errstate(all="ignore"):
+        for done in range(0, n_steps, every):
+            state = integrator.run(state, dt, min(every, n_steps - done))
+            worst = max(worst, abs(energy(*state) / E0 - 1))
+            if not worst < 1:  # blown up (or nan)
+                return np.inf, time.perf_counter() - start
+    return worst, time.perf_counter() - start
+
+
+# * marks runs that do at least as well as the script's own Euler step
+print(
+    f"{'scene':>17} {'method':>9} {'dt / script':>11} {'evaluations':>11}"
+    f" {'energy error':>12} {'time (s)':>9}"
+)
+for name, ((acceleration, energy, state), dt, duration) in scenes.items():
+    runs = [("euler", 1)]
+    runs += [(method, f) for method in ("verlet", "yoshida4") for f in (1, 10, 100)]
+    runs += [(method, f) for method in ("rk45", "dop853") for f in (10, 100)]
+    for method, factor in runs:
+        integrator = INTEGRATORS[method](acceleration)
+        error, elapsed = drift(integrator, energy, state, factor * dt, duration)
+        if method == "euler":
+            baseline = error
+        print(
+            f"{name:>17} {method:>9} {factor:11} {integrator.evaluations:11}"
+            f" {error:12.1e} {elapsed:9.3f} {'*' if error <= baseline else ''}"
+        )
@@ -0,0 +1,136 @@
+import numpy as np
+from vptools.integrators import INTEGRATORS
+
+G = 6.6743e-11
+
+
+class Gravity:
+    """Newtonian gravity of N bodies, state held in (N, 3) arrays.
+
+    All pairwise accelerations come from one broadcast (in blocks of about
+    chunk pairs), with |r|**2 + softening**2 in place of |r|**2. Bodies
+    marked fixed (a central sun) pull but never move. Test particles, added
+    after the bodies, feel the bodies but pull nothing, so thousands of them
+    cost no more than thousands of (target, body) pairs. The state is stepped
+    by one of vptools.integrators (default velocity Verlet); spheres are only
+    touched in sync, when a frame is drawn.
+    """
+
+    def __init__(
+        self,
+        pos,
+        vel,
+        mass,
+        fixed=None,
+        softening=0.0,
+        G=G,
+        integrator="verlet",
+        chunk=1 << 20,
+    ):
+        self.mass = np.asarray(mass, dtype=float)
+        self.n_bodies = len(self.mass)
+        self.fixed = np.zeros(self.n_bodies, bool) if fixed is None else np.array(fixed)
+        self.softening, self.G, self.chunk = softening, G, chunk
+        self.integrator = INTEGRATORS[integrator](self.acceleration)
+        pos = np.array(pos, dtype=float).reshape(-1, 3)
+        vel = np.array(vel, dtype=float).reshape(-1, 3)
+        vel[self.fixed] = 0
+        self.pos, self.vel = pos, vel
+
+    @classmethod
+    def from_spheres(cls, spheres, fixed=None, **kwargs):
+        """Bodies from vpython objects with pos, v and m (a missing v is at rest)."""
+        pos = [[s.pos.x, s.pos.y, s.pos.z] for s in spheres]
+        vel = [[s.v.x, s.v.y, s.v.z] if hasattr(s, "v") else [0, 0, 0] for s in spheres]
+        return cls(pos, vel, [s.m for s in spheres], fixed, **kwargs)
+
+    def add_test_particles(self, pos, vel):
+        """Append massless particles; returns the slice of their rows."""
+        start = len(self.pos)
+        self.pos = np.concatenate([self.pos, np.reshape(pos, (-1, 3))])
+        self.vel = np.concatenate([self.vel, np.reshape(vel, (-1, 3))])
+        return slice(start, len(self.pos))
+
+    def acceleration(self, x):
+        """Accelerations of every row of x (bodies first, then test particles)."""
+        source, gm = x[: self.n_bodies], self.G * self.mass
+        a = np.empty_like(x)
+        step = max(1, self.chunk // max(self.n_bodies, 1))
+        for start in range(0, len(x), step):
+            r = source[None] - x[start : start + step, None]  # (targets, bodies, 3)
+            d2 = np.einsum("tbk,tbk->tb", r, r) + self.softening**2
+            with np.errstate(divide="ignore"):
+                inv = np.where(d2 > 0, d2, np.inf) ** -1.5  # 0 for a body on itself
+            a[start : start + step] = np.einsum("tb,tbk->tk", gm * inv, r)
+        a[: self.n_bodies][self.fixed] = 0
+        return a
+
+    def step(self, dt, n_steps=1):
+        state = self.integrator.run((self.pos, self.vel), dt, n_steps)
+        self.pos, self.vel = state
+
+    def energy(self):
+        """Kinetic plus potential energy of the bodies (test particles have none)."""
+        x, v = self.pos[: self.n_bodies], self.vel[: self.n_bodies]
+        i, j = np.triu_indices(self.n_bodies, 1)
+        d = np.sqrt(np.sum((x[i] - x[j]) ** 2, -1) + self.softening**2)
+        kinetic = 0.5 * np.sum(self.mass * np.sum(v * v, -1))
+        return kinetic - self.G * np.sum(self.mass[i] * self.mass[j] / d)
+
+    def sync(self, spheres, rows=None):
+        """Move vpython objects to the positions of rows (default: the first ones)."""
+        from vpython import vector
+
+        rows = range(len(spheres)) if rows is None else rows
+        for s, (x, y, z) in zip(spheres, self.pos[rows].tolist()):
+            s.pos = vector(x, y, z)
+
+
+if __name__ == "__main__":  # python -m vptools.gravity, from the repository root
+    import time
+
+    # two equal bodies on a circular orbit: energy and momentum stay put
+    m, a = 1e24, 1e8
+    v = np.sqrt(G * m / (4 * a))
+    pair = Gravity([[-a, 0, 0], [a, 0, 0]], [[0, -v, 0], [0, v, 0]], [m, m])
+    E0 = pair.energy()
+    period = 2 * np.pi * a / v
+    pair.step(period / 1000, 1000)
+    assert abs(pair.energy() / E0 - 1) < 1e-5
+    assert np.allclose(pair.pos, [[-a, 0, 0], [a, 0, 0]], atol=1e-4 * a)
+    assert np.allclose(pair.mass @ pair.vel, 0, atol=1e-6 * m * v)
+
+    # a test particle on a circular orbit around a fixed star comes back
+    star = Gravity([[0, 0, 0]], [[0, 0, 0]], [m], fixed=[True])
+    rows = star.add_test_particles([[2 * a, 0, 0]], [[0, v * np.sqrt(2), 0]])
+    star.step(period * np.sqrt(2) / 1000, 1000)
+    assert np.allclose(star.pos[rows], [[2 * a, 0, 0]], atol=1e-3 * a)
+    assert np.all(star.pos[0] == 0)
+
+    # the sun, eight planets and 5000 asteroids
+    au, sun = 1.496e11, 1.989e30
+    radii = np.array([0.39, 0.72, 1.0, 1.52, 5.2, 9.54, 19.2, 30.1]) * au
+    masses = np.array([0.33, 4.87, 5.97, 0.642, 1898, 568, 86.8, 102]) * 1e24
+    rng = np.random.default_rng(0)
+    r = rng.uniform(2.2, 3.2, 5000) * au
+    phase = rng.uniform(0, 2 * np.pi, 5000)
+
+    def circular(r, phase):
+        x, y = r * np.cos(phase), r * np.sin(phase)
+        u = np.sqrt(G * sun / r)
+        return np.stack([x, y, 0 * x], -1), np.stack([-u * y / r, u * x / r, 0 * x], -1)
+
+    pos, vel = circular(radii, np.zeros(8))
+    pos, vel = np.concatenate([[[0, 0, 0]], pos]), np.concatenate([[[0, 0, 0]], vel])
+    solar = Gravity(
+        pos, vel, np.concatenate([[sun], masses]), fixed=[True] + [False] * 8
+    )
+    solar.add_test_particles(*circular(r, phase))
+    E0 = solar.energy()
+    start = time.perf_counter()
+    solar.step(86400, 365)
+    elapsed = time.perf_counter() - start
+    print(f"9 bodies + 5000 test particles: {365 / elapsed:.0f} steps/s")
+    assert abs(solar.energy() / E0 - 1) < 1e-6
+    distance = np.linalg.norm(solar.pos[9:], axis=-1)
+    assert np.all(np.abs(distance / r - 1) < 0.05)  # Jupiter stirs them, a little
@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from functools import partial
+import numpy as np
+
+
+class Integrator(ABC):
+    """Steps a state (x, v) of position and velocity arrays by dt, for x'' = a(x).
+
+    acceleration(x) returns an array shaped like x. evaluations counts its
+    calls, the usual measure of the cost of a step. The symplectic methods
+    need the acceleration to depend on x only (no drag).
+    """
+
+    order = None
+
+    def __init__(self, acceleration):
+        self.acceleration = acceleration
+        self.evaluations = 0
+
+    def _a(self, x):
+        self.evaluations += 1
+        return self.acceleration(x)
+
+    @abstractmethod
+    def step(self, state, dt):
+        """The state dt later, as a new (x, v)."""
+
+    def run(self, state, dt, n_steps):
+        for _ in range(n_steps):
+            state = self.step(state, dt)
+        return state
+
+
+class SemiImplicitEuler(Integrator):
+    """v += a dt, then x += v dt: what the VPython scripts do by hand."""
+
+    order = 1
+
+    def step(self, state, dt):
+        x, v = state
+        v = v + self._a(x) * dt
+        return x + v * dt, v
+
+
+class VelocityVerlet(Integrator):
+    """Kick-drift-kick leapfrog, one evaluation per step.
+
+    The acceleration at the end of a step is kept for the start of the next
+    one, as long as that step starts from the x this one returned.
+    """
+
+    order = 2
+
+    def __init__(self, acceleration):
+        super().__init__(acceleration)
+        self._x, self._ax = None, None
+
+    def step(self, state, dt):
+        x, v = state
+        a = self._ax if x is self._x else self._a(x)
+        v = v + 0.5 * dt * a
+        x = x + dt * v
+        self._x, self._ax = x, self._a(x)
+        return x, v + 0.5 * dt * self._ax
+
+
+_W1 = 1 / (2 - 2 ** (1 / 3))
+_W0 = -(2 ** (1 / 3)) * _W1
+
+
+class Yoshida4(Integrator):
+    """Yoshida's 4th order triple jump of leapfrogs, three evaluations per step.
+
+    Drifts of c dt alternate with kicks of d dt; the middle leapfrog runs
+    backwards in time (_W0 < 0), which cancels the dt**3 error.
+    """
+
+    order = 4
+    c = (_W1 / 2, (_W0 + _W1) / 2, (_W0 + _W1) / 2, _W1 / 2)
+    d = (_W1, _W0, _W1)
+
+    def step(self, state, dt):
+        x, v = state
+        for c, d in zip(self.c, self.d):
+            x = x + c * dt * v
+            v = v + d * dt * self._a(x)
+        return x + self.c[-1] * dt * v, v
+
+
+class AdaptiveRK(Integrator):
+    """scipy's embedded Runge-Kutta pairs, "RK45" or "DOP853", over each dt.
+
+    A step of dt is as many internal steps as rtol needs, the first one as
+    long as the last accepted one. atol=None sets the absolute tolerance to
+    rtol times the largest |x| (or |v| dt) and |v| (or |x| / dt) of the state,
+    so components crossing zero neither stall the solver nor need a scale.
+    Not symplectic: the energy error grows with time, but is held to ~rtol.
+    """
+
+    def __init__(self, acceleration, method="RK45", rtol=1e-9, atol=None):
+        from scipy.integrate import solve_ivp
+
+        super().__init__(acceleration)
+        self._solve_ivp = solve_ivp
+        self.method, self.rtol, self.atol = method, rtol, atol
+        self.order = {"RK45": 5, "DOP853": 8}.get(method)
+        self._h = None
+
+    def step(self, state, dt):
+        x, v = (np.asarray(part, dtype=float) for part in state)
+        n = x.size
+
+        def f(t, y):
+            return np.concatenate([y[n:], self._a(y[:n].reshape(x.shape)).ravel()])
+
+        atol = self.atol
+        if atol is None:
+            size_x, size_v = np.max(np.abs(x)), np.max(np.abs(v))
+            scale = [max(size_x, size_v * abs(dt)), max(size_v, size_x / abs(dt))]
+            atol = np.repeat(self.rtol * np.maximum(scale, 1e-300), n)
+        solution = self._solve_ivp(
+            f,
+            (0.0, dt),
+            np.concatenate([x.ravel(), v.ravel()]),
+            method=self.method,
+            rtol=self.rtol,
+            atol=atol,
+            first_step=None if self._h is None else min(self._h, abs(dt)),
+        )
+        if not solution.success:
+            raise RuntimeError(solution.message)
+        if len(solution.t) > 2:  # the last step may be cut short to land on dt
+            self._h = solution.t[-2] - solution.t[-3]
+        y = solution.y[:, -1]
+        return y[:n].reshape(x.shape), y[n:].reshape(x.shape)
+
+
+INTEGRATORS = {
+    "euler": SemiImplicitEuler,
+    "verlet": VelocityVerlet,
+    "yoshida4": Yoshida4,
+    "rk45": partial(AdaptiveRK, method="RK45"),
+    "dop853": partial(AdaptiveRK, method="DOP853"),
+}
+
+
+if __name__ == "__main__":  # a harmonic oscillator, against cos t
+    for name, integrator in INTEGRATORS.items():
+        errors = []
+        for dt in 0.1, 0.05:
+            stepper = integrator(lambda x: -x)
+            x, v = stepper.run((np.ones(1), np.zeros(1)), dt, round(10 / dt))
+            errors.append(abs(x[0] - np.cos(10)))
+        order = np.log2(errors[0] / errors[1])
+        print(f"{name:>8}: error {errors[1]:.1e} at dt = 0.05, order {order:.1f}")
+        if name in ("euler", "verlet", "yoshida4"):
+            assert abs(order - stepper.order) < 0.2, name
+        else:
+            assert errors[1] < 1e-7, name
@@ -0,0 +1,106 @@
+import struct
+import zlib
+import numpy as np
+
+# colormaps: t in [0, 1] -> (..., 3) rgb in [0, 1]
+COLORMAPS = {
+    "gray": lambda t: np.stack([t, t, t], -1),
+    # red for high, green for low, as hw07 colours the potential
+    "redgreen": lambda t: np.stack([t, 1 - t, np.zeros_like(t)], -1),
+}
+
+
+def colorize(data, vmin=None, vmax=None, cmap="gray"):
+    """(H, W, 3) uint8 image of a 2D array, with vmin..vmax spread over the colormap."""
+    data = np.asarray(data, dtype=float)
+    vmin = np.min(data) if vmin is None else vmin
+    vmax = np.max(data) if vmax is None else vmax
+    t = np.clip((data - vmin) / max(vmax - vmin, 1e-300), 0, 1)
+    return np.round(255 * COLORMAPS[cmap](t)).astype(np.uint8)
+
+
+def write_png(path, rgb):
+    """Write an (H, W, 3) uint8 array as an 8-bit RGB PNG, row 0 at the top."""
+    rgb = np.ascontiguousarray(rgb, dtype=np.uint8)
+    height, width = rgb.shape[:2]
+
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body))
+
+    rows = np.concatenate([np.zeros((height, 1), np.uint8), rgb.reshape(height, -1)], 1)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)))  # filter 0 per row
+        f.write(chunk(b"IEND", b""))
+
+
+def heatmap(
+    data, pos, length, height, path, vmin=None, vmax=None, cmap="gray", canvas=None
+):
+    """Show data[i, j] (i along x, j along y) as one textured box centred at pos.
+
+    The image is written to path, which must be relative to the directory the
+    script runs from: that is where the vpython server looks for textures.
+    """
+    from vpython import box, scene
+
+    write_png(path, colorize(np.asarray(data).T[::-1], vmin, vmax, cmap))
+    return box(
+        canvas=canvas if canvas is not None else scene,
+        pos=pos,
+        length=length,
+        height=height,
+        width=min(length, height) / 1000,
+        texture=path,
+    )
+
+
+def field_arrows(Ex, Ey, h, stride=5, scale=1.0, canvas=None, z=0.0, **kwargs):
+    """Arrows of the 2D field (Ex[i, j], Ey[i, j]) at (i*h, j*h), every stride nodes.
+
+    The arrow count is (N / stride)**2 whatever the grid resolution, and each
+    arrow is axis = scale * E.
+    """
+    from vpython import arrow, scene, vector
+
+    canvas = canvas if canvas is not None else scene
+    i, j = np.meshgrid(
+        np.arange(0, Ex.shape[0], stride),
+        np.arange(0, Ex.shape[1], stride),
+        indexing="ij",
+    )
+    return [
+        arrow(
+            canvas=canvas,
+            pos=vector(a * h, b * h, z),
+            axis=vector(scale * ex, scale * ey, 0),
+            **kwargs,
+        )
+        for a, b, ex, ey in zip(
+            i.ravel().tolist(),
+            j.ravel().tolist(),
+            Ex[i, j].ravel().tolist(),
+            Ey[i, j].ravel().tolist(),
+        )
+    ]
+
+
+if __name__ == "__main__":  # round trip through a PNG decoder written inline
+    import os
+    import tempfile
+
+    data = np.add.outer(np.arange(40.0), np.arange(30.0))
+    rgb = colorize(data, cmap="redgreen")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "raster_test.png")
+        write_png(path, rgb)
+        png = open(path, "rb").read()
+    assert png[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height = struct.unpack(">II", png[16:24])
+    length = struct.unpack(">I", png[33:37])[0]
+    raw = np.frombuffer(zlib.decompress(png[41 : 41 + length]), np.uint8)
+    assert (width, height) == (30, 40)
+    assert np.array_equal(raw.reshape(height, -1)[:, 1:].reshape(rgb.shape), rgb)
+    print("png ok")
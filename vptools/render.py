@@ -0,0 +1,93 @@
+import time
+import numpy as np
+
+
+def _vectors(array):
+    from vpython import vector
+
+    return [vector(x, y, z) for x, y, z in np.asarray(array, dtype=float).tolist()]
+
+
+class BulkRenderer:
+    """Draw an (N, 3) position array as many balls in one batched update.
+
+    style="points" uses a single vpython points object, so the whole set is
+    replaced with one clear/append per frame. style="spheres" keeps N sphere
+    objects, for when trails or picking are needed. Either way the scene is
+    only touched at most fps times per second, whatever the step rate is.
+    """
+
+    def __init__(self, pos, radius, color=None, canvas=None, fps=30, style="points"):
+        from vpython import color as vp_color
+        from vpython import points, scene, sphere
+
+        self.canvas = canvas if canvas is not None else scene
+        self.fps = fps
+        self.style = style
+        self.n = len(pos)
+        self.color = color if color is not None else vp_color.white
+        self.radius = radius
+        self._last = -np.inf
+
+        if style == "points":
+            self.obj = points(
+                canvas=self.canvas, radius=float(np.mean(radius)), size_units="world"
+            )
+        elif style == "spheres":
+            colors = self._each(self._as_vector(self.color))
+            self.obj = [
+                sphere(canvas=self.canvas, radius=size, color=c)
+                for size, c in zip(self._each(radius), colors)
+            ]
+        else:
+            raise ValueError(f"unknown style {style!r}")
+        self.update(pos, force=True)
+
+    def _each(self, value):
+        # per-ball list from one radius / vector, or from a per-ball sequence
+        if np.ndim(value) == 0:
+            return [value] * self.n
+        return list(value)
+
+    def update(self, pos, color=None, radius=None, force=False):
+        """Show new positions (and optionally colors / radii); skipped between frames.
+
+        Returns True if the scene was updated.
+        """
+        now = time.perf_counter()
+        if not force and now - self._last < 1.0 / self.fps:
+            return False
+        self._last = now
+
+        if color is not None:
+            self.color = color
+        if radius is not None:
+            self.radius = radius
+        vectors = _vectors(pos)
+
+        if self.style == "points":
+            colors = self._each(self._as_vector(self.color))
+            radii = self._each(self.radius)
+            self.obj.clear()
+            self.obj.append(
+                [
+                    {"pos": p, "color": c, "radius": r}
+                    for p, c, r in zip(vectors, colors, radii)
+                ]
+            )
+        else:
+            for ball, p in zip(self.obj, vectors):
+                ball.pos = p
+            if color is not None:
+                for ball, c in zip(self.obj, self._each(self._as_vector(color))):
+                    ball.color = c
+            if radius is not None:
+                for ball, r in zip(self.obj, self._each(radius)):
+                    ball.radius = r
+        return True
+
+    def _as_vector(self, color):
+        # an (N, 3) array becomes N vectors, a single vector stays as it is
+        if np.ndim(color) == 2:
+            return _vectors(color)
+        return color
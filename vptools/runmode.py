@@ -0,0 +1,47 @@
+import argparse
+import os
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes", "on")
+
+
+class RunMode:
+    """How a script runs: rendered every step, every Kth step, or headless.
+
+    Headless scripts never create a canvas or graph (and never import vpython),
+    so the physics runs at full speed and only metrics are written.
+    """
+
+    def __init__(self, headless=False, render_every=1):
+        self.headless = headless
+        self.render_every = max(int(render_every), 1)
+        self._rate = None
+
+    @classmethod
+    def from_args(cls, argv=None):
+        """Read --headless / --render-every K, or VP_HEADLESS / VP_RENDER_EVERY."""
+        parser = argparse.ArgumentParser(add_help=False)
+        parser.add_argument(
+            "--headless", action="store_true", default=_env_flag("VP_HEADLESS")
+        )
+        parser.add_argument(
+            "--render-every",
+            type=int,
+            default=int(os.environ.get("VP_RENDER_EVERY", 1)),
+        )
+        args, _ = parser.parse_known_args(argv)
+        return cls(headless=args.headless, render_every=args.render_every)
+
+    def render(self, step):
+        """Whether the scene should be updated on this step."""
+        return not self.headless and step % self.render_every == 0
+
+    def rate(self, frequency, step=0):
+        """vpython.rate(frequency), called only on rendered steps."""
+        if self.render(step):
+            if self._rate is None:
+                from vpython import rate
+
+                self._rate = rate
+            self._rate(frequency)
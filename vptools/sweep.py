@@ -0,0 +1,46 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+
+def sweep(function, params, processes=None, window=None):
+    """Yield (param, function(param)) for each param, in the order of params.
+
+    The calls run in a pool of `processes` worker processes (default: all
+    cores; 1 runs them here, one by one). Results are yielded as soon as
+    every earlier param is done, so a plot can be fed while the sweep runs.
+    At most `window` calls (default: 4 per process) are in flight at once.
+
+    function must be picklable (a module-level function or a
+    functools.partial of one), and a script using the pool must keep its
+    top-level code under `if __name__ == "__main__":`.
+    """
+    params = list(params)
+    processes = processes or os.cpu_count()
+    if processes == 1:
+        for param in params:
+            yield param, function(param)
+        return
+
+    window = window or 4 * processes
+    with ProcessPoolExecutor(processes) as pool:
+        running = {}  # future -> index of its param
+        done = {}  # index -> result, waiting for the earlier ones
+        submitted = yielded = 0
+        while yielded < len(params):
+            while submitted < len(params) and len(running) < window:
+                running[pool.submit(function, params[submitted])] = submitted
+                submitted += 1
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done[running.pop(future)] = future.result()
+            while yielded in done:
+                yield params[yielded], done.pop(yielded)
+                yielded += 1
+
+
+if __name__ == "__main__":
+    import math
+
+    factorials = list(sweep(math.factorial, range(200), processes=2, window=3))
+    assert factorials == [(n, math.factorial(n)) for n in range(200)]
+    print("sweep keeps the order of its params")
@@ -0,0 +1,11 @@
+import time
+
+
+def timed(function, *args, repeat=3):
+    """Best wall time of `repeat` calls of function(*args), and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result